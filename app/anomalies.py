@@ -0,0 +1,223 @@
+"""Fleet data-quality scan.
+
+Vehicles are partitioned into batches and their fillup/trip histories are
+scanned in a process pool. Findings are written back by the parent process
+so SQLite only ever sees a single writer. Each vehicle's history is
+fingerprinted so incremental runs only rescan vehicles that changed.
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from statistics import median
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from . import crud, database, models
+
+# Vehicles handed to a worker at a time
+BATCH_SIZE = 50
+
+# A fill-to-fill MPG this far from the vehicle's median is flagged
+MPG_OUTLIER_FACTOR = 3.0
+# Minimum number of MPG samples before the median is trusted
+MPG_MIN_SAMPLES = 4
+# Anything above this is implausible for a combustion vehicle
+MPG_ABSOLUTE_MAX = 150.0
+
+def _fingerprint_rows(db: Session) -> Dict[int, str]:
+    """Each live vehicle's creation time and revision, which every crud write bumps.
+
+    Aggregates such as sums of mileage miss edits that move values between
+    rows, like swapping two odometer readings, which is exactly a rollback.
+    """
+    return {
+        vehicle_id: f"{created_at.isoformat() if created_at else ''}:{revision}"
+        for vehicle_id, _, created_at, revision in crud.get_vehicle_revisions(db)
+    }
+
+def find_odometer_rollbacks(fillups) -> List[dict]:
+    """Flag fillups whose mileage is lower than an earlier fillup's."""
+    findings = []
+    highest = None
+    for fillup in sorted(fillups, key=lambda f: (f.date or datetime.min, f.id)):
+        if highest is not None and fillup.mileage < highest.mileage:
+            findings.append({
+                "kind": "odometer_rollback",
+                "record_type": "fillup",
+                "record_id": fillup.id,
+                "reason": f"Mileage {fillup.mileage:,.1f} is lower than {highest.mileage:,.1f} recorded by earlier fillup #{highest.id}",
+            })
+        elif highest is None or fillup.mileage > highest.mileage:
+            highest = fillup
+    return findings
+
+def find_mpg_outliers(fillups, fuel_type: str = "gasoline") -> List[dict]:
+    """Flag full-tank to full-tank intervals with an implausible MPG."""
+    sorted_fillups = sorted(fillups, key=lambda f: f.mileage)
+    samples = []
+    for previous, current in zip(sorted_fillups, sorted_fillups[1:]):
+        if previous.is_full_tank and current.is_full_tank:
+            miles = current.mileage - previous.mileage
+            if miles > 0 and previous.gallons > 0:
+                samples.append((current, miles / previous.gallons))
+
+    findings = []
+    typical = median(mpg for _, mpg in samples) if len(samples) >= MPG_MIN_SAMPLES else None
+    for fillup, mpg in samples:
+        if fuel_type != "electric" and mpg > MPG_ABSOLUTE_MAX:
+            reason = f"{mpg:.1f} MPG exceeds the plausible maximum of {MPG_ABSOLUTE_MAX:.0f}"
+        elif typical and (mpg > typical * MPG_OUTLIER_FACTOR or mpg < typical / MPG_OUTLIER_FACTOR):
+            reason = f"{mpg:.1f} MPG is far from this vehicle's median of {typical:.1f}"
+        else:
+            continue
+        findings.append({
+            "kind": "mpg_outlier",
+            "record_type": "fillup",
+            "record_id": fillup.id,
+            "reason": reason,
+        })
+    return findings
+
+def find_duplicate_fillups(fillups) -> List[dict]:
+    """Flag fillups that repeat an earlier one on the same day (e.g. a fuel card row imported twice)."""
+    findings = []
+    seen = {}
+    for fillup in sorted(fillups, key=lambda f: f.id):
+        key = (fillup.date.date() if fillup.date else None, round(fillup.mileage, 1),
+               round(fillup.gallons, 3), round(fillup.total_cost, 2))
+        if key in seen:
+            findings.append({
+                "kind": "duplicate_fillup",
+                "record_type": "fillup",
+                "record_id": fillup.id,
+                "reason": f"Same date, mileage, gallons and cost as fillup #{seen[key]}",
+            })
+        else:
+            seen[key] = fillup.id
+    return findings
+
+def find_overlapping_trips(trips) -> List[dict]:
+    """Flag trips that start before the previous completed trip ended."""
+    findings = []
+    latest = None
+    for trip in sorted(trips, key=lambda t: (t.start_date or datetime.min, t.id)):
+        if trip.end_mileage is not None and trip.end_mileage < trip.start_mileage:
+            findings.append({
+                "kind": "odometer_rollback",
+                "record_type": "trip",
+                "record_id": trip.id,
+                "reason": f"End mileage {trip.end_mileage:,.1f} is lower than start mileage {trip.start_mileage:,.1f}",
+            })
+        if latest is not None and trip.start_date and trip.start_date < latest.end_date:
+            findings.append({
+                "kind": "overlapping_trip",
+                "record_type": "trip",
+                "record_id": trip.id,
+                "reason": f"Starts before trip #{latest.id} ended",
+            })
+        if trip.end_date and (latest is None or trip.end_date > latest.end_date):
+            latest = trip
+    return findings
+
+def scan_vehicle(db: Session, vehicle_id: int, fuel_type: str) -> List[dict]:
+    """Run every detector over one vehicle's history."""
+    fillups = db.query(
+        models.Fillup.id, models.Fillup.date, models.Fillup.mileage, models.Fillup.gallons,
+        models.Fillup.total_cost, models.Fillup.is_full_tank,
+    ).filter(models.Fillup.vehicle_id == vehicle_id).all()
+    trips = db.query(
+        models.Trip.id, models.Trip.start_date, models.Trip.end_date,
+        models.Trip.start_mileage, models.Trip.end_mileage,
+    ).filter(models.Trip.vehicle_id == vehicle_id).all()
+
+    findings = (
+        find_odometer_rollbacks(fillups)
+        + find_mpg_outliers(fillups, fuel_type)
+        + find_duplicate_fillups(fillups)
+        + find_overlapping_trips(trips)
+    )
+    for finding in findings:
+        finding["vehicle_id"] = vehicle_id
+    return findings
+
+def _scan_batch(vehicles: List[tuple]) -> List[dict]:
+    db = database.SessionLocal()
+    try:
+        findings = []
+        for vehicle_id, fuel_type in vehicles:
+            findings.extend(scan_vehicle(db, vehicle_id, fuel_type))
+        return findings
+    finally:
+        db.close()
+
+def run_scan(db: Session, full: bool = False, max_workers: Optional[int] = None) -> dict:
+    """Scan the fleet and persist findings.
+
+    Only vehicles whose history changed since the last run are rescanned
+    unless ``full`` is set.
+    """
+    fingerprints = _fingerprint_rows(db)
+    previous = {state.vehicle_id: state.fingerprint for state in db.query(models.AnomalyScanState)}
+
+    if full:
+        changed = list(fingerprints)
+    else:
+        changed = [vid for vid, fp in fingerprints.items() if previous.get(vid) != fp]
+    removed = [vid for vid in previous if vid not in fingerprints]
+
+    fuel_types = dict(db.query(models.Vehicle.id, models.Vehicle.fuel_type))
+    vehicles = [(vid, fuel_types.get(vid) or "gasoline") for vid in changed]
+    batches = [vehicles[i:i + BATCH_SIZE] for i in range(0, len(vehicles), BATCH_SIZE)]
+
+    findings = []
+    if len(batches) == 1:
+        findings = _scan_batch(batches[0])
+    elif batches:
+        workers = min(max_workers or os.cpu_count() or 1, len(batches))
+        with ProcessPoolExecutor(max_workers=workers, initializer=database.init_worker_process) as pool:
+            for batch_findings in pool.map(_scan_batch, batches):
+                findings.extend(batch_findings)
+
+    # A vehicle soft-deleted while the batches ran is being purged; writing
+    # findings for it would race the purge
+    live = set(_fingerprint_rows(db))
+    findings = [finding for finding in findings if finding["vehicle_id"] in live]
+
+    stale = changed + removed
+    if stale:
+        db.query(models.Anomaly).filter(models.Anomaly.vehicle_id.in_(stale)).delete(synchronize_session=False)
+    if removed:
+        db.query(models.AnomalyScanState).filter(models.AnomalyScanState.vehicle_id.in_(removed)).delete(synchronize_session=False)
+    db.bulk_insert_mappings(models.Anomaly, findings)
+    for vehicle_id in changed:
+        db.merge(models.AnomalyScanState(vehicle_id=vehicle_id, fingerprint=fingerprints[vehicle_id]))
+    db.commit()
+
+    return {"vehicles_scanned": len(changed), "anomalies_found": len(findings)}
+
+def get_anomalies(db: Session, vehicle_id: int = None, kind: str = None, skip: int = 0, limit: int = 100):
+    query = db.query(models.Anomaly).filter(crud.not_deleted(models.Anomaly.vehicle_id))
+    if vehicle_id is not None:
+        query = query.filter(models.Anomaly.vehicle_id == vehicle_id)
+    if kind:
+        query = query.filter(models.Anomaly.kind == kind)
+    return query.order_by(models.Anomaly.vehicle_id, models.Anomaly.id).offset(skip).limit(limit).all()
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan the fleet for data-quality anomalies.")
+    parser.add_argument("--full", action="store_true", help="rescan every vehicle, not just changed ones")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size")
+    args = parser.parse_args()
+
+    models.Base.metadata.create_all(bind=database.engine)
+    db = database.SessionLocal()
+    try:
+        result = run_scan(db, full=args.full, max_workers=args.workers)
+    finally:
+        db.close()
+    print(f"Scanned {result['vehicles_scanned']} vehicles, found {result['anomalies_found']} anomalies")
+
+if __name__ == "__main__":
+    main()
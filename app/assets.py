@@ -0,0 +1,237 @@
+"""Fingerprinted static assets, the pre-rendered page and response compression.
+
+At startup every file under ``static/`` is read once, given a content-hashed
+URL (``/static/js/app.<hash>.js``) and compressed ahead of time with brotli
+and gzip; if the ``brotli`` requirement is missing only gzip is used. Hashed
+URLs never change content, so they are served with a one-year immutable cache
+lifetime; the plain URLs still work but must be revalidated by ETag. ``index.html`` has
+no per-request content, so it is rendered once against the hashed URLs.
+
+``CompressionMiddleware`` negotiates the same encodings for large JSON and CSV
+API responses.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_DIR = "static"
+STATIC_URL = "/static"
+PAGE_TEMPLATE = "index.html"
+# Rebuild when a static file or the template changes on disk (for development)
+ASSET_RELOAD = os.environ.get("ASSET_RELOAD", "").lower() in ("1", "true", "yes")
+# API responses smaller than this are sent uncompressed
+COMPRESS_MIN_BYTES = int(os.environ.get("COMPRESS_MIN_BYTES", "1024"))
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+HASH_LENGTH = 12
+
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+# API response types compressed on the fly
+RESPONSE_TYPES = ("application/json", "text/csv")
+# Preferred first when the client accepts several equally
+ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+
+@dataclass
+class Asset:
+    body: bytes
+    media_type: str
+    digest: str
+    variants: Dict[str, bytes] = field(default_factory=dict)
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.digest}"'
+
+_assets: Dict[str, Asset] = {}      # relative path -> asset
+_hashed_paths: Dict[str, str] = {}  # hashed relative path -> relative path
+_page: Optional[Asset] = None
+_sources: Dict[str, float] = {}     # source file -> mtime at build
+
+def is_compressible(media_type: str) -> bool:
+    return media_type.startswith(COMPRESSIBLE_TYPES)
+
+def compress(body: bytes, encoding: str, fast: bool = False) -> bytes:
+    """Compress with the maximum ratio for assets built once, or quickly for responses."""
+    if encoding == "br":
+        return brotli.compress(body, quality=5 if fast else 11)
+    return gzip.compress(body, compresslevel=6 if fast else 9, mtime=0)
+
+def _make_asset(body: bytes, media_type: str) -> Asset:
+    asset = Asset(body=body, media_type=media_type, digest=hashlib.sha256(body).hexdigest()[:HASH_LENGTH])
+    if is_compressible(media_type):
+        for encoding in ENCODINGS:
+            compressed = compress(body, encoding)
+            if len(compressed) < len(body):
+                asset.variants[encoding] = compressed
+    return asset
+
+def hashed_name(path: str, digest: str) -> str:
+    root, ext = os.path.splitext(path)
+    return f"{root}.{digest}{ext}"
+
+def build(templates, static_dir: str = STATIC_DIR):
+    """Fingerprint and precompress the static files, then render the page."""
+    global _assets, _hashed_paths, _page, _sources
+    assets, hashed_paths, sources = {}, {}, {}
+    for dirpath, _, filenames in os.walk(static_dir):
+        for filename in filenames:
+            source = os.path.join(dirpath, filename)
+            path = os.path.relpath(source, static_dir).replace(os.sep, "/")
+            with open(source, "rb") as f:
+                body = f.read()
+            sources[source] = os.path.getmtime(source)
+            media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+            assets[path] = _make_asset(body, media_type)
+            hashed_paths[hashed_name(path, assets[path].digest)] = path
+
+    template = templates.get_template(PAGE_TEMPLATE)
+    if template.filename:
+        sources[template.filename] = os.path.getmtime(template.filename)
+    _assets, _hashed_paths, _sources = assets, hashed_paths, sources
+    _page = _make_asset(template.render(asset_url=asset_url).encode(), "text/html")
+
+def _stale() -> bool:
+    try:
+        return any(os.path.getmtime(source) != mtime for source, mtime in _sources.items())
+    except FileNotFoundError:
+        return True
+
+def refresh(templates):
+    """Rebuild if never built, or if ``ASSET_RELOAD`` is set and a source changed."""
+    if _page is None or (ASSET_RELOAD and _stale()):
+        build(templates)
+
+def asset_url(path: str) -> str:
+    """Content-hashed URL for a file under ``static/``."""
+    asset = _assets.get(path)
+    if asset is None:
+        return f"{STATIC_URL}/{path}"
+    return f"{STATIC_URL}/{hashed_name(path, asset.digest)}"
+
+def negotiate(accept_encoding: str, available: Iterable[str]) -> Optional[str]:
+    """The best of ``available`` that the Accept-Encoding header allows, if any."""
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+def _etag_matches(if_none_match: Optional[str], digest: str) -> bool:
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        # Encoded variants carry their encoding after the digest
+        if tag.strip('"').split("-")[0] == digest:
+            return True
+    return False
+
+def _respond(asset: Asset, headers: Headers, cache_control: str) -> Response:
+    encoding = negotiate(headers.get("accept-encoding", ""), [e for e in ENCODINGS if e in asset.variants])
+    response_headers = {
+        "Cache-Control": cache_control,
+        "ETag": f'"{asset.digest}-{encoding}"' if encoding else asset.etag,
+    }
+    if asset.variants:
+        response_headers["Vary"] = "Accept-Encoding"
+    if _etag_matches(headers.get("if-none-match"), asset.digest):
+        return Response(status_code=304, headers=response_headers)
+    if encoding:
+        response_headers["Content-Encoding"] = encoding
+        return Response(asset.variants[encoding], media_type=asset.media_type, headers=response_headers)
+    return Response(asset.body, media_type=asset.media_type, headers=response_headers)
+
+def page_response(headers: Headers) -> Response:
+    return _respond(_page, headers, REVALIDATE_CACHE_CONTROL)
+
+def static_response(path: str, headers: Headers) -> Optional[Response]:
+    """Response for a file under ``static/`` by hashed or plain path, or None."""
+    if path in _hashed_paths:
+        return _respond(_assets[_hashed_paths[path]], headers, IMMUTABLE_CACHE_CONTROL)
+    if path in _assets:
+        return _respond(_assets[path], headers, REVALIDATE_CACHE_CONTROL)
+    return None
+
+class CompressionMiddleware:
+    """Compress complete JSON/CSV responses of at least ``minimum_size`` bytes.
+
+    Unlike starlette's GZipMiddleware this negotiates brotli as well and
+    leaves other content types alone; static assets arrive already encoded.
+    Streaming responses pass through uncompressed.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), ENCODINGS)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if "content-encoding" in headers or not headers.get("content-type", "").startswith(RESPONSE_TYPES):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+            if passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if start_message is not None:
+                if message.get("more_body", False) or len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                body = compress(body, encoding, fast=True)
+                headers = MutableHeaders(raw=start_message["headers"])
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                headers.add_vary_header("Accept-Encoding")
+                await send(start_message)
+                await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
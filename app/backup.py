@@ -0,0 +1,298 @@
+"""Online snapshot backups and point-in-time restore.
+
+Snapshots are taken with SQLite's online backup API a few pages at a time
+from a pinned WAL read snapshot, so the app keeps accepting writes while a
+backup runs and the copy is consistent as of its start. Each snapshot is
+gzip-compressed into ``BACKUP_DIR``; a snapshot identical to the previous one
+is not stored again, and only the newest ``BACKUP_RETENTION`` are kept.
+
+Command line, run from the repository root:
+
+    python -m app.backup create
+    python -m app.backup list
+    python -m app.backup restore [--at 2024-06-01T12:00:00 | --name FILE]
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Optional
+
+from . import database
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+BACKUP_DIR = os.environ.get("BACKUP_DIR", "./data/backups")
+# Seconds between scheduled snapshots; 0 disables the scheduler
+BACKUP_INTERVAL_SECONDS = int(os.environ.get("BACKUP_INTERVAL_SECONDS", "3600"))
+BACKUP_RETENTION = int(os.environ.get("BACKUP_RETENTION", "14"))
+
+# Pages copied per backup step and the pause between steps, which leaves
+# disk bandwidth for request writes while a large database is copied (about
+# 45 MB/s). Faster pacing lets the copy's dirty pages pile up until kernel
+# writeback competes with request commits for the disk.
+PAGES_PER_STEP = 256
+STEP_PAUSE_SECONDS = 0.02
+
+MANIFEST_NAME = "manifest.json"
+# Time of the last successful run, including runs that stored nothing new
+LAST_CHECK_NAME = "last_check.json"
+# Microseconds keep names unique when snapshots are taken in the same second
+TIMESTAMP_FORMAT = "%Y%m%dT%H%M%S%f"
+LOCK_NAME = "manifest.lock"
+
+_backup_lock = threading.Lock()
+_last_error = None
+_scheduler = None
+_scheduler_stop = threading.Event()
+
+def database_path() -> str:
+    return database.engine.url.database
+
+def _manifest_path(backup_dir: str) -> str:
+    return os.path.join(backup_dir, MANIFEST_NAME)
+
+def load_manifest(backup_dir: str = BACKUP_DIR) -> List[dict]:
+    """Snapshots recorded in the backup directory, oldest first."""
+    try:
+        with open(_manifest_path(backup_dir)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+@contextmanager
+def _manifest_lock(backup_dir: str):
+    """Serialize manifest updates across processes (the app and the CLI).
+
+    _backup_lock only covers threads of one process.
+    """
+    with open(os.path.join(backup_dir, LOCK_NAME), "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _save_manifest(backup_dir: str, entries: List[dict]):
+    tmp_path = _manifest_path(backup_dir) + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(entries, f, indent=2)
+    os.replace(tmp_path, _manifest_path(backup_dir))
+
+def load_last_check(backup_dir: str = BACKUP_DIR) -> Optional[dict]:
+    try:
+        with open(os.path.join(backup_dir, LAST_CHECK_NAME)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def _save_last_check(backup_dir: str, checked_at: datetime, started: float, stored: bool):
+    tmp_path = os.path.join(backup_dir, LAST_CHECK_NAME + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump({
+            "checked_at": checked_at.isoformat(),
+            "duration_seconds": round(time.monotonic() - started, 3),
+            "stored": stored,
+        }, f)
+    os.replace(tmp_path, os.path.join(backup_dir, LAST_CHECK_NAME))
+
+def copy_online(source_path: str, target_path: str, pages: int = PAGES_PER_STEP,
+                pause: float = STEP_PAUSE_SECONDS, durable: bool = True):
+    """Copy a live database with the SQLite online backup API.
+
+    Without an open read transaction SQLite restarts the backup whenever
+    another connection writes, which under steady fillup traffic means it
+    never finishes. Holding one pins a WAL snapshot instead; writers are not
+    blocked, though the WAL cannot be checkpointed past it until the copy ends.
+
+    With ``durable`` unset the target is written without a journal or fsync.
+    Syncing the whole copy at once saturates the disk and stalls request
+    commits (each fsyncs the WAL) for ~100 ms per 200 MB, which is not worth
+    it for a scratch copy that is compressed right away.
+    """
+    source = sqlite3.connect(source_path, isolation_level=None)
+    target = sqlite3.connect(target_path)
+    if not durable:
+        target.execute("PRAGMA journal_mode=OFF")
+        target.execute("PRAGMA synchronous=OFF")
+    try:
+        source.execute("BEGIN")
+        source.execute("SELECT count(*) FROM sqlite_master").fetchone()
+        source.backup(target, pages=pages, progress=lambda status, remaining, total: time.sleep(pause) if remaining else None)
+        source.execute("COMMIT")
+    finally:
+        target.close()
+        source.close()
+
+def _compress(raw_path: str, gz_path: str) -> str:
+    """Gzip raw_path into gz_path and return the SHA-256 of the raw bytes."""
+    digest = hashlib.sha256()
+    with open(raw_path, "rb") as raw, gzip.open(gz_path, "wb", compresslevel=6) as out:
+        for block in iter(lambda: raw.read(1024 * 1024), b""):
+            digest.update(block)
+            out.write(block)
+    return digest.hexdigest()
+
+def create_snapshot(backup_dir: str = BACKUP_DIR, pages: int = PAGES_PER_STEP,
+                    pause: float = STEP_PAUSE_SECONDS, force: bool = False) -> Optional[dict]:
+    """Take a compressed snapshot of the live database.
+
+    Returns the manifest entry, or None if the data is unchanged since the
+    previous snapshot and ``force`` is not set.
+    """
+    global _last_error
+    os.makedirs(backup_dir, exist_ok=True)
+    with _backup_lock:
+        started = time.monotonic()
+        created_at = datetime.now()
+        name = f"{os.path.splitext(os.path.basename(database_path()))[0]}-{created_at.strftime(TIMESTAMP_FORMAT)}.db.gz"
+        try:
+            with tempfile.TemporaryDirectory(dir=backup_dir) as tmp:
+                raw_path = os.path.join(tmp, "snapshot.db")
+                gz_path = os.path.join(tmp, name)
+                copy_online(database_path(), raw_path, pages, pause, durable=False)
+                size = os.path.getsize(raw_path)
+                checksum = _compress(raw_path, gz_path)
+
+                with _manifest_lock(backup_dir):
+                    entries = load_manifest(backup_dir)
+                    if entries and entries[-1]["sha256"] == checksum and not force:
+                        _save_last_check(backup_dir, created_at, started, stored=False)
+                        _last_error = None
+                        return None
+                    os.replace(gz_path, os.path.join(backup_dir, name))
+
+                    entry = {
+                        "name": name,
+                        "created_at": created_at.isoformat(),
+                        "sha256": checksum,
+                        "size_bytes": size,
+                        "compressed_bytes": os.path.getsize(os.path.join(backup_dir, name)),
+                        "duration_seconds": round(time.monotonic() - started, 3),
+                    }
+                    entries.append(entry)
+                    kept = entries[-BACKUP_RETENTION:]
+                    kept_names = {e["name"] for e in kept}
+                    for expired in entries[:-BACKUP_RETENTION]:
+                        if expired["name"] in kept_names:
+                            continue
+                        try:
+                            os.remove(os.path.join(backup_dir, expired["name"]))
+                        except FileNotFoundError:
+                            pass
+                    _save_manifest(backup_dir, kept)
+                    _save_last_check(backup_dir, created_at, started, stored=True)
+        except Exception as exc:
+            _last_error = f"{created_at.isoformat()}: {exc}"
+            raise
+        _last_error = None
+        return entry
+
+def find_snapshot(at: Optional[datetime] = None, name: Optional[str] = None,
+                  backup_dir: str = BACKUP_DIR) -> Optional[dict]:
+    """The named snapshot, else the newest one taken at or before ``at``."""
+    entries = load_manifest(backup_dir)
+    if name:
+        return next((e for e in entries if e["name"] == name), None)
+    if at:
+        entries = [e for e in entries if datetime.fromisoformat(e["created_at"]) <= at]
+    return entries[-1] if entries else None
+
+def restore_snapshot(entry: dict, backup_dir: str = BACKUP_DIR, target_path: Optional[str] = None):
+    """Overwrite the database with a snapshot.
+
+    The copy goes through the backup API so an open database stays
+    consistent, but the app should be stopped while restoring.
+    """
+    target_path = target_path or database_path()
+    with tempfile.TemporaryDirectory(dir=backup_dir) as tmp:
+        raw_path = os.path.join(tmp, "restore.db")
+        with gzip.open(os.path.join(backup_dir, entry["name"]), "rb") as src, open(raw_path, "wb") as out:
+            shutil.copyfileobj(src, out, 1024 * 1024)
+        copy_online(raw_path, target_path, pages=-1, pause=0)
+
+def backup_status(backup_dir: str = BACKUP_DIR) -> dict:
+    """Backup health for monitoring.
+
+    Lag is measured from the last successful run rather than the last stored
+    snapshot, so an idle database whose snapshots are skipped does not look stale.
+    """
+    entries = load_manifest(backup_dir)
+    last = entries[-1] if entries else None
+    check = load_last_check(backup_dir)
+    checked_at = check["checked_at"] if check else last["created_at"] if last else None
+    lag = (datetime.now() - datetime.fromisoformat(checked_at)).total_seconds() if checked_at else None
+    return {
+        "snapshots": len(entries),
+        "last_backup_at": last["created_at"] if last else None,
+        "last_duration_seconds": last["duration_seconds"] if last else None,
+        "last_size_bytes": last["size_bytes"] if last else None,
+        "last_compressed_bytes": last["compressed_bytes"] if last else None,
+        "last_checked_at": checked_at,
+        "last_check_duration_seconds": check["duration_seconds"] if check else None,
+        "lag_seconds": round(lag, 1) if lag is not None else None,
+        "interval_seconds": BACKUP_INTERVAL_SECONDS,
+        "in_progress": _backup_lock.locked(),
+        "last_error": _last_error,
+    }
+
+def _run_scheduler():
+    while not _scheduler_stop.wait(BACKUP_INTERVAL_SECONDS):
+        try:
+            create_snapshot()
+        except Exception:
+            # Recorded in _last_error and reported by backup_status
+            pass
+
+def start_scheduler():
+    global _scheduler
+    if BACKUP_INTERVAL_SECONDS <= 0 or _scheduler is not None:
+        return
+    _scheduler_stop.clear()
+    _scheduler = threading.Thread(target=_run_scheduler, name="backup-scheduler", daemon=True)
+    _scheduler.start()
+
+def stop_scheduler():
+    global _scheduler
+    _scheduler_stop.set()
+    _scheduler = None
+
+def main():
+    parser = argparse.ArgumentParser(description="Back up or restore the mileage tracker database.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    create = subparsers.add_parser("create", help="take a snapshot now")
+    create.add_argument("--force", action="store_true", help="store the snapshot even if nothing changed")
+    subparsers.add_parser("list", help="list snapshots")
+    restore = subparsers.add_parser("restore", help="restore a snapshot (stop the app first)")
+    restore.add_argument("--at", type=datetime.fromisoformat, help="restore the newest snapshot taken at or before this time")
+    restore.add_argument("--name", help="restore a snapshot by file name")
+    args = parser.parse_args()
+
+    if args.command == "create":
+        entry = create_snapshot(force=args.force)
+        print(f"Created {entry['name']} in {entry['duration_seconds']}s" if entry else "No changes since the last snapshot")
+    elif args.command == "list":
+        for entry in load_manifest():
+            print(f"{entry['created_at']}  {entry['name']}  {entry['size_bytes']:,} bytes ({entry['compressed_bytes']:,} compressed)")
+    elif args.command == "restore":
+        entry = find_snapshot(at=args.at, name=args.name)
+        if entry is None:
+            parser.error("no matching snapshot")
+        restore_snapshot(entry)
+        print(f"Restored {entry['name']}")
+
+if __name__ == "__main__":
+    main()
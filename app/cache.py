@@ -0,0 +1,151 @@
+"""Read-through cache for per-vehicle queries.
+
+Entries are keyed by query name, vehicle and parameters, bounded by an LRU
+size limit and a TTL, and tagged with the vehicle's generation number. The
+crud write functions bump a vehicle's generation, which invalidates only
+that vehicle's entries. With ``CACHE_SHARED_STORE`` set, generations live in
+a small SQLite file so every worker process sees the others' invalidations.
+
+Cached values are pydantic schemas, never ORM instances, so they are safe to
+share between sessions and threads.
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", "2048"))
+CACHE_TTL_SECONDS = float(os.environ.get("CACHE_TTL_SECONDS", "300"))
+CACHE_SHARED_STORE = os.environ.get("CACHE_SHARED_STORE")
+
+class LocalGenerations:
+    """Per-process generation counters."""
+
+    def __init__(self):
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, vehicle_id: int) -> int:
+        return self._generations.get(vehicle_id, 0)
+
+    def bump(self, vehicle_id: int):
+        with self._lock:
+            self._generations[vehicle_id] = self._generations.get(vehicle_id, 0) + 1
+
+class SharedGenerations:
+    """Generation counters in a SQLite file shared by all worker processes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS generations (vehicle_id INTEGER PRIMARY KEY, generation INTEGER NOT NULL)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def get(self, vehicle_id: int) -> int:
+        row = self._connection().execute("SELECT generation FROM generations WHERE vehicle_id = ?", (vehicle_id,)).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, vehicle_id: int):
+        self._connection().execute(
+            "INSERT INTO generations (vehicle_id, generation) VALUES (?, 1) "
+            "ON CONFLICT(vehicle_id) DO UPDATE SET generation = generation + 1",
+            (vehicle_id,),
+        )
+
+class QueryCache:
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl_seconds: float = CACHE_TTL_SECONDS,
+                 shared_store: Optional[str] = CACHE_SHARED_STORE):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.generations = SharedGenerations(shared_store) if shared_store else LocalGenerations()
+        self._entries = OrderedDict()  # key -> (value, generation, expires_at)
+        self._keys_by_vehicle = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_or_load(self, query: str, vehicle_id: int, params: Hashable, loader: Callable):
+        """Return the cached result, or call ``loader`` and cache what it returns.
+
+        ``None`` results are not cached.
+        """
+        key = (query, vehicle_id, params)
+        generation = self.generations.get(vehicle_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, entry_generation, expires_at = entry
+                if entry_generation == generation and expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+            self.misses += 1
+
+        # The generation was read before loading, so a write that lands
+        # meanwhile makes this entry stale on the next read
+        value = loader()
+        if value is None:
+            return None
+        with self._lock:
+            self._entries[key] = (value, generation, now + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            self._keys_by_vehicle.setdefault(vehicle_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return value
+
+    def _remove(self, key):
+        self._entries.pop(key, None)
+        keys = self._keys_by_vehicle.get(key[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_vehicle[key[1]]
+
+    def invalidate_vehicle(self, vehicle_id: int):
+        """Drop every cached result for one vehicle, in this and other workers."""
+        self.generations.bump(vehicle_id)
+        with self._lock:
+            for key in list(self._keys_by_vehicle.get(vehicle_id, ())):
+                self._remove(key)
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_vehicle.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "shared_store": isinstance(self.generations, SharedGenerations),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+query_cache = QueryCache()
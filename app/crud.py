@@ -1,53 +1,193 @@
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, desc
+from sqlalchemy import func, desc, or_, and_, delete, select, type_coerce, String
+from sqlalchemy.dialects.sqlite import insert
 from . import models, schemas
-from typing import List
+from .cache import query_cache
+from typing import List, Optional, Tuple
 from datetime import datetime, timedelta
+import base64
+import time
+
+def _invalidate(*vehicle_ids):
+    """Drop cached reads for the vehicles a write touched."""
+    for vehicle_id in set(vehicle_ids):
+        if vehicle_id is not None:
+            query_cache.invalidate_vehicle(vehicle_id)
+
+def _bump_revisions(db: Session, *vehicle_ids):
+    """Record a change to these vehicles' data in the current transaction."""
+    for vehicle_id in set(vehicle_ids):
+        if vehicle_id is not None:
+            db.execute(insert(models.VehicleRevision).values(vehicle_id=vehicle_id, revision=1).on_conflict_do_update(
+                index_elements=[models.VehicleRevision.vehicle_id],
+                set_={"revision": models.VehicleRevision.revision + 1},
+            ))
+
+def not_deleted(vehicle_id_column):
+    """Filter out rows of vehicles that are soft-deleted and waiting to be purged."""
+    return vehicle_id_column.notin_(select(models.Vehicle.id).where(models.Vehicle.deleted_at.isnot(None)))
+
+def get_vehicle_revisions(db: Session, vehicle_ids: Optional[List[int]] = None) -> List[Tuple[int, str, datetime, int]]:
+    """(id, name, created_at, revision) of each live vehicle; changes whenever its data does."""
+    query = db.query(
+        models.Vehicle.id, models.Vehicle.name, models.Vehicle.created_at, func.coalesce(models.VehicleRevision.revision, 0),
+    ).outerjoin(
+        models.VehicleRevision, models.VehicleRevision.vehicle_id == models.Vehicle.id
+    ).filter(models.Vehicle.deleted_at.is_(None))
+    if vehicle_ids:
+        query = query.filter(models.Vehicle.id.in_(vehicle_ids))
+    return [tuple(row) for row in query.order_by(models.Vehicle.id)]
 
 # Vehicle CRUD
 def create_vehicle(db: Session, vehicle: schemas.VehicleCreate):
     db_vehicle = models.Vehicle(**vehicle.dict())
     db.add(db_vehicle)
+    db.flush()
+    _bump_revisions(db, db_vehicle.id)
     db.commit()
     db.refresh(db_vehicle)
+    _invalidate(db_vehicle.id)
     return db_vehicle
 
 def get_vehicles(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Vehicle).offset(skip).limit(limit).all()
+    return db.query(models.Vehicle).filter(models.Vehicle.deleted_at.is_(None)).offset(skip).limit(limit).all()
 
 def get_vehicle_by_id(db: Session, vehicle_id: int):
-    return db.query(models.Vehicle).filter(models.Vehicle.id == vehicle_id).first()
+    return db.query(models.Vehicle).filter(models.Vehicle.id == vehicle_id, models.Vehicle.deleted_at.is_(None)).first()
+
+def get_cached_vehicle(db: Session, vehicle_id: int) -> Optional[schemas.Vehicle]:
+    """Read-only copy of a vehicle, served from the query cache."""
+    def load():
+        vehicle = get_vehicle_by_id(db, vehicle_id)
+        return schemas.Vehicle.model_validate(vehicle) if vehicle else None
+    return query_cache.get_or_load("vehicle", vehicle_id, (), load)
 
 def get_vehicle_by_name(db: Session, vehicle_name: str):
     return db.query(models.Vehicle).filter(models.Vehicle.name == vehicle_name).first()
 
-def get_vehicle_with_details(db: Session, vehicle_id: int):
-    return db.query(models.Vehicle).options(
-        joinedload(models.Vehicle.fillups),
-        joinedload(models.Vehicle.maintenance_records),
-        joinedload(models.Vehicle.trips)
-    ).filter(models.Vehicle.id == vehicle_id).first()
+# Child collections served by the details endpoint, newest first by date
+DETAIL_COLLECTIONS = {
+    "fillups": (models.Fillup, models.Fillup.date),
+    "maintenance_records": (models.MaintenanceRecord, models.MaintenanceRecord.date),
+    "trips": (models.Trip, models.Trip.start_date),
+}
+
+def encode_cursor(date: str, record_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{date}|{record_id}".encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Raises ValueError for a malformed cursor."""
+    try:
+        date, record_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        datetime.fromisoformat(date)
+        return date, int(record_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+def get_vehicle_collection_page(db: Session, vehicle_id: int, collection: str, cursor: Optional[str] = None, limit: int = 10):
+    """Get one page of a vehicle's child records, keyset-paginated on (date, id)."""
+    model, date_column = DETAIL_COLLECTIONS[collection]
+    # Key on the stored text: rows dated by func.now() have no fractional
+    # seconds, so comparing against a bound datetime would not match them
+    stored_date = type_coerce(date_column, String)
+    query = db.query(model, stored_date).filter(model.vehicle_id == vehicle_id)
+    if cursor:
+        date, record_id = decode_cursor(cursor)
+        query = query.filter(or_(stored_date < date, and_(stored_date == date, model.id < record_id)))
+    rows = query.order_by(desc(stored_date), desc(model.id)).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last, last_date = rows[-1]
+        next_cursor = encode_cursor(last_date, last.id)
+    return [item for item, _ in rows], next_cursor
+
+def get_vehicle_with_details(db: Session, vehicle_id: int, limit: int = 10):
+    """Get a vehicle with the latest records and count of each child collection.
+
+    Each collection is a separate bounded query, so the cost grows with the
+    sum of the collections rather than their product as with joinedload.
+    """
+    vehicle = get_vehicle_by_id(db, vehicle_id)
+    if not vehicle:
+        return None
+
+    details = {"vehicle": vehicle}
+    for collection, (model, _) in DETAIL_COLLECTIONS.items():
+        items, next_cursor = get_vehicle_collection_page(db, vehicle_id, collection, limit=limit)
+        count = db.query(func.count(model.id)).filter(model.vehicle_id == vehicle_id).scalar()
+        details[collection] = {"items": items, "count": count, "next_cursor": next_cursor}
+    return details
 
 def update_vehicle(db: Session, vehicle_id: int, vehicle_update: schemas.VehicleCreate):
-    db_vehicle = db.query(models.Vehicle).filter(models.Vehicle.id == vehicle_id).first()
+    db_vehicle = get_vehicle_by_id(db, vehicle_id)
     if db_vehicle:
         for key, value in vehicle_update.dict().items():
             setattr(db_vehicle, key, value)
+        _bump_revisions(db, vehicle_id)
         db.commit()
         db.refresh(db_vehicle)
+        _invalidate(vehicle_id)
     return db_vehicle
 
+# Tables whose rows belong to a vehicle. Databases created before ON DELETE
+# CASCADE was declared still need these removed explicitly.
+VEHICLE_CHILD_MODELS = (models.Fillup, models.MaintenanceRecord, models.Trip, models.Anomaly)
+
+# Rows removed per transaction when purging in the background
+PURGE_CHUNK_SIZE = 500
+# Pause between chunks so other writers can take the lock
+PURGE_PAUSE_SECONDS = 0.05
+
 def delete_vehicle(db: Session, vehicle_id: int):
-    db_vehicle = db.query(models.Vehicle).filter(models.Vehicle.id == vehicle_id).first()
+    """Delete a vehicle and its records with bulk DELETEs, without loading them."""
+    db_vehicle = get_vehicle_by_id(db, vehicle_id)
+    if db_vehicle:
+        for model in VEHICLE_CHILD_MODELS:
+            db.execute(delete(model).where(model.vehicle_id == vehicle_id))
+        db.execute(delete(models.AnomalyScanState).where(models.AnomalyScanState.vehicle_id == vehicle_id))
+        db.execute(delete(models.Vehicle).where(models.Vehicle.id == vehicle_id))
+        _bump_revisions(db, vehicle_id)
+        db.commit()
+        _invalidate(vehicle_id)
+    return db_vehicle
+
+def soft_delete_vehicle(db: Session, vehicle_id: int):
+    """Hide a vehicle immediately; its records are removed later by purge_vehicle."""
+    db_vehicle = get_vehicle_by_id(db, vehicle_id)
     if db_vehicle:
-        db.delete(db_vehicle)
+        db_vehicle.deleted_at = datetime.now()
+        db_vehicle.is_active = False
+        _bump_revisions(db, vehicle_id)
         db.commit()
+        _invalidate(vehicle_id)
     return db_vehicle
 
+def purge_vehicle(db: Session, vehicle_id: int, chunk_size: int = PURGE_CHUNK_SIZE):
+    """Remove a soft-deleted vehicle's records in short transactions, then the vehicle."""
+    for model in VEHICLE_CHILD_MODELS:
+        while True:
+            chunk = select(model.id).where(model.vehicle_id == vehicle_id).limit(chunk_size)
+            deleted = db.execute(delete(model).where(model.id.in_(chunk))).rowcount
+            db.commit()
+            if deleted < chunk_size:
+                break
+            time.sleep(PURGE_PAUSE_SECONDS)
+    db.execute(delete(models.AnomalyScanState).where(models.AnomalyScanState.vehicle_id == vehicle_id))
+    db.execute(delete(models.Vehicle).where(models.Vehicle.id == vehicle_id, models.Vehicle.deleted_at.isnot(None)))
+    _bump_revisions(db, vehicle_id)
+    db.commit()
+    _invalidate(vehicle_id)
+
+def get_vehicles_pending_purge(db: Session) -> List[int]:
+    return [row[0] for row in db.query(models.Vehicle.id).filter(models.Vehicle.deleted_at.isnot(None))]
+
 # Fillup CRUD
 def create_fillup(db: Session, fillup: schemas.FillupCreate):
     db_fillup = models.Fillup(**fillup.dict())
     db.add(db_fillup)
+    _bump_revisions(db, fillup.vehicle_id)
     db.commit()
     db.refresh(db_fillup)
 
@@ -57,58 +197,79 @@ def create_fillup(db: Session, fillup: schemas.FillupCreate):
         vehicle.current_mileage = fillup.mileage
         db.commit()
 
+    _invalidate(fillup.vehicle_id)
     return db_fillup
 
-def get_fillups_by_vehicle(db: Session, vehicle_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Fillup).filter(models.Fillup.vehicle_id == vehicle_id).order_by(desc(models.Fillup.date)).offset(skip).limit(limit).all()
+def get_fillups_by_vehicle(db: Session, vehicle_id: int, skip: int = 0, limit: int = 100) -> List[schemas.Fillup]:
+    def load():
+        fillups = db.query(models.Fillup).filter(models.Fillup.vehicle_id == vehicle_id).order_by(desc(models.Fillup.date)).offset(skip).limit(limit).all()
+        return [schemas.Fillup.model_validate(f) for f in fillups]
+    return query_cache.get_or_load("fillups", vehicle_id, (skip, limit), load)
 
 def get_all_fillups(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Fillup).options(joinedload(models.Fillup.vehicle)).order_by(desc(models.Fillup.date)).offset(skip).limit(limit).all()
+    return db.query(models.Fillup).options(joinedload(models.Fillup.vehicle)).filter(not_deleted(models.Fillup.vehicle_id)).order_by(desc(models.Fillup.date)).offset(skip).limit(limit).all()
 
 def update_fillup(db: Session, fillup_id: int, fillup_update: schemas.FillupCreate):
     db_fillup = db.query(models.Fillup).filter(models.Fillup.id == fillup_id).first()
     if db_fillup:
+        previous_vehicle_id = db_fillup.vehicle_id
         for key, value in fillup_update.dict().items():
             setattr(db_fillup, key, value)
+        _bump_revisions(db, previous_vehicle_id, db_fillup.vehicle_id)
         db.commit()
         db.refresh(db_fillup)
+        _invalidate(previous_vehicle_id, db_fillup.vehicle_id)
     return db_fillup
 
 def delete_fillup(db: Session, fillup_id: int):
     db_fillup = db.query(models.Fillup).filter(models.Fillup.id == fillup_id).first()
     if db_fillup:
+        vehicle_id = db_fillup.vehicle_id
         db.delete(db_fillup)
+        _bump_revisions(db, vehicle_id)
         db.commit()
+        _invalidate(vehicle_id)
     return db_fillup
 
 # Maintenance Record CRUD
 def create_maintenance_record(db: Session, record: schemas.MaintenanceRecordCreate):
     db_record = models.MaintenanceRecord(**record.dict())
     db.add(db_record)
+    _bump_revisions(db, record.vehicle_id)
     db.commit()
     db.refresh(db_record)
+    _invalidate(record.vehicle_id)
     return db_record
 
-def get_maintenance_records_by_vehicle(db: Session, vehicle_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.MaintenanceRecord).filter(models.MaintenanceRecord.vehicle_id == vehicle_id).order_by(desc(models.MaintenanceRecord.date)).offset(skip).limit(limit).all()
+def get_maintenance_records_by_vehicle(db: Session, vehicle_id: int, skip: int = 0, limit: int = 100) -> List[schemas.MaintenanceRecord]:
+    def load():
+        records = db.query(models.MaintenanceRecord).filter(models.MaintenanceRecord.vehicle_id == vehicle_id).order_by(desc(models.MaintenanceRecord.date)).offset(skip).limit(limit).all()
+        return [schemas.MaintenanceRecord.model_validate(r) for r in records]
+    return query_cache.get_or_load("maintenance_records", vehicle_id, (skip, limit), load)
 
 def get_all_maintenance_records(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.MaintenanceRecord).options(joinedload(models.MaintenanceRecord.vehicle)).order_by(desc(models.MaintenanceRecord.date)).offset(skip).limit(limit).all()
+    return db.query(models.MaintenanceRecord).options(joinedload(models.MaintenanceRecord.vehicle)).filter(not_deleted(models.MaintenanceRecord.vehicle_id)).order_by(desc(models.MaintenanceRecord.date)).offset(skip).limit(limit).all()
 
 def update_maintenance_record(db: Session, record_id: int, record_update: schemas.MaintenanceRecordCreate):
     db_record = db.query(models.MaintenanceRecord).filter(models.MaintenanceRecord.id == record_id).first()
     if db_record:
+        previous_vehicle_id = db_record.vehicle_id
         for key, value in record_update.dict().items():
             setattr(db_record, key, value)
+        _bump_revisions(db, previous_vehicle_id, db_record.vehicle_id)
         db.commit()
         db.refresh(db_record)
+        _invalidate(previous_vehicle_id, db_record.vehicle_id)
     return db_record
 
 def delete_maintenance_record(db: Session, record_id: int):
     db_record = db.query(models.MaintenanceRecord).filter(models.MaintenanceRecord.id == record_id).first()
     if db_record:
+        vehicle_id = db_record.vehicle_id
         db.delete(db_record)
+        _bump_revisions(db, vehicle_id)
         db.commit()
+        _invalidate(vehicle_id)
     return db_record
 
 # Trip CRUD
@@ -117,8 +278,10 @@ def create_trip(db: Session, trip: schemas.TripCreate):
     if trip.end_mileage and trip.start_mileage:
         db_trip.distance = trip.end_mileage - trip.start_mileage
     db.add(db_trip)
+    _bump_revisions(db, trip.vehicle_id)
     db.commit()
     db.refresh(db_trip)
+    _invalidate(trip.vehicle_id)
     # Eagerly load vehicle relationship
     db_trip = db.query(models.Trip).options(joinedload(models.Trip.vehicle)).filter(models.Trip.id == db_trip.id).first()
     return db_trip
@@ -126,15 +289,19 @@ def create_trip(db: Session, trip: schemas.TripCreate):
 def get_trip_by_id(db: Session, trip_id: int):
     return db.query(models.Trip).options(joinedload(models.Trip.vehicle)).filter(models.Trip.id == trip_id).first()
 
-def get_trips_by_vehicle(db: Session, vehicle_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Trip).filter(models.Trip.vehicle_id == vehicle_id).order_by(desc(models.Trip.start_date)).offset(skip).limit(limit).all()
+def get_trips_by_vehicle(db: Session, vehicle_id: int, skip: int = 0, limit: int = 100) -> List[schemas.Trip]:
+    def load():
+        trips = db.query(models.Trip).filter(models.Trip.vehicle_id == vehicle_id).order_by(desc(models.Trip.start_date)).offset(skip).limit(limit).all()
+        return [schemas.Trip.model_validate(t) for t in trips]
+    return query_cache.get_or_load("trips", vehicle_id, (skip, limit), load)
 
 def get_all_trips(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Trip).options(joinedload(models.Trip.vehicle)).order_by(desc(models.Trip.start_date)).offset(skip).limit(limit).all()
+    return db.query(models.Trip).options(joinedload(models.Trip.vehicle)).filter(not_deleted(models.Trip.vehicle_id)).order_by(desc(models.Trip.start_date)).offset(skip).limit(limit).all()
 
 def update_trip(db: Session, trip_id: int, trip_update: dict):
     db_trip = db.query(models.Trip).filter(models.Trip.id == trip_id).first()
     if db_trip:
+        previous_vehicle_id = db_trip.vehicle_id
         for key, value in trip_update.items():
             setattr(db_trip, key, value)
         # Recalculate distance if mileage changed
@@ -143,8 +310,10 @@ def update_trip(db: Session, trip_id: int, trip_update: dict):
             end = trip_update.get('end_mileage', db_trip.end_mileage)
             if start and end:
                 db_trip.distance = end - start
+        _bump_revisions(db, previous_vehicle_id, db_trip.vehicle_id)
         db.commit()
         db.refresh(db_trip)
+        _invalidate(previous_vehicle_id, db_trip.vehicle_id)
     return db_trip
 
 def complete_trip(db: Session, trip_id: int, end_mileage: float, end_location: str = None):
@@ -160,8 +329,11 @@ def complete_trip(db: Session, trip_id: int, end_mileage: float, end_location: s
 def delete_trip(db: Session, trip_id: int):
     db_trip = db.query(models.Trip).filter(models.Trip.id == trip_id).first()
     if db_trip:
+        vehicle_id = db_trip.vehicle_id
         db.delete(db_trip)
+        _bump_revisions(db, vehicle_id)
         db.commit()
+        _invalidate(vehicle_id)
     return db_trip
 
 # Statistics and calculations
@@ -187,7 +359,10 @@ def calculate_mpg(fillups: List[models.Fillup]) -> float:
 
 def get_vehicle_stats(db: Session, vehicle_id: int) -> schemas.VehicleStats:
     """Get comprehensive statistics for a vehicle."""
-    vehicle = db.query(models.Vehicle).filter(models.Vehicle.id == vehicle_id).first()
+    return query_cache.get_or_load("stats", vehicle_id, (), lambda: _load_vehicle_stats(db, vehicle_id))
+
+def _load_vehicle_stats(db: Session, vehicle_id: int) -> schemas.VehicleStats:
+    vehicle = get_vehicle_by_id(db, vehicle_id)
     if not vehicle:
         return None
 
@@ -233,10 +408,10 @@ def get_dashboard_stats(db: Session) -> schemas.DashboardStats:
 
     # Recent fillups (last 30 days)
     thirty_days_ago = datetime.now() - timedelta(days=30)
-    recent_fillups = db.query(func.count(models.Fillup.id)).filter(models.Fillup.date >= thirty_days_ago).scalar()
+    recent_fillups = db.query(func.count(models.Fillup.id)).filter(models.Fillup.date >= thirty_days_ago, not_deleted(models.Fillup.vehicle_id)).scalar()
 
     # All fillups for fuel cost calculation
-    all_fillups = db.query(models.Fillup).all()
+    all_fillups = db.query(models.Fillup).filter(not_deleted(models.Fillup.vehicle_id)).all()
     total_fuel_cost = sum(f.total_cost for f in all_fillups)
 
     # Calculate average MPG across all vehicles
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -7,6 +7,16 @@ SQLALCHEMY_DATABASE_URL = "sqlite:///./data/mileage_tracker.db"
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    # SQLite ignores ON DELETE CASCADE unless foreign keys are switched on per connection
+    cursor.execute("PRAGMA foreign_keys=ON")
+    # WAL lets readers (including online backups) run alongside a writer
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -17,3 +27,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def init_worker_process():
+    """Drop pooled connections inherited from a parent process after fork."""
+    engine.dispose(close=False)
@@ -1,26 +1,97 @@
-from fastapi import FastAPI, Depends, HTTPException, Request
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, BackgroundTasks
+from fastapi.responses import HTMLResponse, Response
 from starlette.templating import Jinja2Templates
 from sqlalchemy.orm import Session
-from typing import List
-from . import database, models, schemas, crud
+import json
+import threading
+from datetime import datetime
+from typing import List, Optional
+from . import database, models, schemas, crud, anomalies, reports, tco, backup, assets
+from .cache import query_cache
 
 app = FastAPI(title="Mileage Tracker")
 
 # Create database tables
 models.Base.metadata.create_all(bind=database.engine)
-
-# Mount static files
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# create_all does not add columns to tables that already exist
+with database.engine.begin() as connection:
+    vehicle_columns = {row[1] for row in connection.exec_driver_sql("PRAGMA table_info(vehicles)")}
+    if "deleted_at" not in vehicle_columns:
+        connection.exec_driver_sql("ALTER TABLE vehicles ADD COLUMN deleted_at DATETIME")
+    # vehicle_revisions briefly had an ON DELETE CASCADE foreign key, which
+    # reset counters when a vehicle id was reused; rebuild it without one
+    if list(connection.exec_driver_sql("PRAGMA foreign_key_list(vehicle_revisions)")):
+        connection.exec_driver_sql("ALTER TABLE vehicle_revisions RENAME TO vehicle_revisions_old")
+        models.VehicleRevision.__table__.create(bind=connection)
+        connection.exec_driver_sql("INSERT INTO vehicle_revisions SELECT vehicle_id, revision FROM vehicle_revisions_old")
+        connection.exec_driver_sql("DROP TABLE vehicle_revisions_old")
+# create_all skips indexes on tables that already exist
+for table in models.Base.metadata.sorted_tables:
+    for index in table.indexes:
+        index.create(bind=database.engine, checkfirst=True)
+
+# Compress large JSON and CSV responses
+app.add_middleware(assets.CompressionMiddleware)
 
 # Setup templates
 templates = Jinja2Templates(directory="templates")
 
+@app.on_event("startup")
+def build_assets():
+    assets.build(templates)
+
+@app.on_event("startup")
+def resume_report_jobs():
+    db = database.SessionLocal()
+    try:
+        reports.resume_pending(db)
+    finally:
+        db.close()
+
+def purge_vehicles(vehicle_ids: List[int]):
+    db = database.SessionLocal()
+    try:
+        for vehicle_id in vehicle_ids:
+            crud.purge_vehicle(db, vehicle_id)
+    finally:
+        db.close()
+
+@app.on_event("startup")
+def resume_vehicle_purges():
+    db = database.SessionLocal()
+    try:
+        vehicle_ids = crud.get_vehicles_pending_purge(db)
+    finally:
+        db.close()
+    if vehicle_ids:
+        threading.Thread(target=purge_vehicles, args=(vehicle_ids,), daemon=True).start()
+
+@app.on_event("startup")
+def start_backup_scheduler():
+    backup.start_scheduler()
+
+@app.on_event("shutdown")
+def stop_report_workers():
+    reports.shutdown()
+
+@app.on_event("shutdown")
+def stop_backup_scheduler():
+    backup.stop_scheduler()
+
 @app.get("/", response_class=HTMLResponse)
 async def read_root(request: Request):
     """Serve the main page."""
-    return templates.TemplateResponse("index.html", {"request": request})
+    assets.refresh(templates)
+    return assets.page_response(request.headers)
+
+@app.api_route("/static/{path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def read_static(path: str, request: Request):
+    """Serve a static file, by content-hashed or plain name."""
+    assets.refresh(templates)
+    response = assets.static_response(path, request.headers)
+    if response is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    return response
 
 # Dashboard endpoints
 @app.get("/api/dashboard/stats")
@@ -47,11 +118,40 @@ async def get_vehicles(skip: int = 0, limit: int = 100, db: Session = Depends(da
 @app.get("/api/vehicles/{vehicle_id}", response_model=schemas.Vehicle)
 async def get_vehicle(vehicle_id: int, db: Session = Depends(database.get_db)):
     """Get a specific vehicle."""
-    vehicle = crud.get_vehicle_by_id(db, vehicle_id)
+    vehicle = crud.get_cached_vehicle(db, vehicle_id)
     if vehicle is None:
         raise HTTPException(status_code=404, detail="Vehicle not found")
     return vehicle
 
+@app.get("/api/vehicles/{vehicle_id}/details", response_model=schemas.VehicleDetails)
+async def get_vehicle_details(vehicle_id: int, limit: int = Query(10, ge=1, le=100), db: Session = Depends(database.get_db)):
+    """Get a vehicle with its latest fill-ups, maintenance records and trips."""
+    details = crud.get_vehicle_with_details(db, vehicle_id, limit=limit)
+    if details is None:
+        raise HTTPException(status_code=404, detail="Vehicle not found")
+    return details
+
+DETAIL_PAGE_SCHEMAS = {
+    "fillups": schemas.FillupPage,
+    "maintenance_records": schemas.MaintenanceRecordPage,
+    "trips": schemas.TripPage,
+}
+
+@app.get("/api/vehicles/{vehicle_id}/details/{collection}")
+async def get_vehicle_details_page(vehicle_id: int, collection: str, cursor: Optional[str] = None, limit: int = Query(10, ge=1, le=100), db: Session = Depends(database.get_db)):
+    """Get the next page of one of a vehicle's detail collections."""
+    if collection not in DETAIL_PAGE_SCHEMAS:
+        raise HTTPException(status_code=404, detail="Unknown collection")
+    vehicle = crud.get_cached_vehicle(db, vehicle_id)
+    if not vehicle:
+        raise HTTPException(status_code=404, detail="Vehicle not found")
+
+    try:
+        items, next_cursor = crud.get_vehicle_collection_page(db, vehicle_id, collection, cursor=cursor, limit=limit)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return DETAIL_PAGE_SCHEMAS[collection](items=items, next_cursor=next_cursor)
+
 @app.get("/api/vehicles/{vehicle_id}/stats")
 async def get_vehicle_statistics(vehicle_id: int, db: Session = Depends(database.get_db)):
     """Get statistics for a specific vehicle."""
@@ -69,8 +169,15 @@ async def update_vehicle(vehicle_id: int, vehicle: schemas.VehicleCreate, db: Se
     return db_vehicle
 
 @app.delete("/api/vehicles/{vehicle_id}")
-async def delete_vehicle(vehicle_id: int, db: Session = Depends(database.get_db)):
-    """Delete a vehicle."""
+async def delete_vehicle(vehicle_id: int, background_tasks: BackgroundTasks, background: bool = False, db: Session = Depends(database.get_db)):
+    """Delete a vehicle, or hide it now and purge its records in the background."""
+    if background:
+        db_vehicle = crud.soft_delete_vehicle(db, vehicle_id)
+        if db_vehicle is None:
+            raise HTTPException(status_code=404, detail="Vehicle not found")
+        background_tasks.add_task(purge_vehicles, [vehicle_id])
+        return {"message": "Vehicle scheduled for deletion"}
+
     db_vehicle = crud.delete_vehicle(db, vehicle_id)
     if db_vehicle is None:
         raise HTTPException(status_code=404, detail="Vehicle not found")
@@ -81,7 +188,7 @@ async def delete_vehicle(vehicle_id: int, db: Session = Depends(database.get_db)
 async def create_fillup(fillup: schemas.FillupCreate, db: Session = Depends(database.get_db)):
     """Create a new fillup record."""
     # Verify vehicle exists
-    vehicle = crud.get_vehicle_by_id(db, fillup.vehicle_id)
+    vehicle = crud.get_cached_vehicle(db, fillup.vehicle_id)
     if not vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
 
@@ -101,7 +208,7 @@ async def get_all_fillups(skip: int = 0, limit: int = 100, db: Session = Depends
 async def get_vehicle_fillups(vehicle_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
     """Get fillup records for a specific vehicle."""
     # Verify vehicle exists
-    vehicle = crud.get_vehicle_by_id(db, vehicle_id)
+    vehicle = crud.get_cached_vehicle(db, vehicle_id)
     if not vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
 
@@ -111,6 +218,11 @@ async def get_vehicle_fillups(vehicle_id: int, skip: int = 0, limit: int = 100,
 @app.put("/api/fillups/{fillup_id}", response_model=schemas.Fillup)
 async def update_fillup(fillup_id: int, fillup: schemas.FillupCreate, db: Session = Depends(database.get_db)):
     """Update a fillup record."""
+    # Verify vehicle exists
+    vehicle = crud.get_cached_vehicle(db, fillup.vehicle_id)
+    if not vehicle:
+        raise HTTPException(status_code=404, detail="Vehicle not found")
+
     db_fillup = crud.update_fillup(db, fillup_id, fillup)
     if db_fillup is None:
         raise HTTPException(status_code=404, detail="Fillup record not found")
@@ -129,7 +241,7 @@ async def delete_fillup(fillup_id: int, db: Session = Depends(database.get_db)):
 async def create_maintenance_record(record: schemas.MaintenanceRecordCreate, db: Session = Depends(database.get_db)):
     """Create a new maintenance record."""
     # Verify vehicle exists
-    vehicle = crud.get_vehicle_by_id(db, record.vehicle_id)
+    vehicle = crud.get_cached_vehicle(db, record.vehicle_id)
     if not vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
 
@@ -145,7 +257,7 @@ async def get_all_maintenance_records(skip: int = 0, limit: int = 100, db: Sessi
 async def get_vehicle_maintenance_records(vehicle_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
     """Get maintenance records for a specific vehicle."""
     # Verify vehicle exists
-    vehicle = crud.get_vehicle_by_id(db, vehicle_id)
+    vehicle = crud.get_cached_vehicle(db, vehicle_id)
     if not vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
 
@@ -155,6 +267,11 @@ async def get_vehicle_maintenance_records(vehicle_id: int, skip: int = 0, limit:
 @app.put("/api/maintenance/{record_id}", response_model=schemas.MaintenanceRecord)
 async def update_maintenance_record(record_id: int, record: schemas.MaintenanceRecordCreate, db: Session = Depends(database.get_db)):
     """Update a maintenance record."""
+    # Verify vehicle exists
+    vehicle = crud.get_cached_vehicle(db, record.vehicle_id)
+    if not vehicle:
+        raise HTTPException(status_code=404, detail="Vehicle not found")
+
     db_record = crud.update_maintenance_record(db, record_id, record)
     if db_record is None:
         raise HTTPException(status_code=404, detail="Maintenance record not found")
@@ -173,7 +290,7 @@ async def delete_maintenance_record(record_id: int, db: Session = Depends(databa
 async def create_trip(trip: schemas.TripCreate, db: Session = Depends(database.get_db)):
     """Start a new trip."""
     # Verify vehicle exists
-    vehicle = crud.get_vehicle_by_id(db, trip.vehicle_id)
+    vehicle = crud.get_cached_vehicle(db, trip.vehicle_id)
     if not vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
 
@@ -197,7 +314,7 @@ async def get_trip(trip_id: int, db: Session = Depends(database.get_db)):
 async def get_vehicle_trips(vehicle_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
     """Get trips for a specific vehicle."""
     # Verify vehicle exists
-    vehicle = crud.get_vehicle_by_id(db, vehicle_id)
+    vehicle = crud.get_cached_vehicle(db, vehicle_id)
     if not vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
 
@@ -216,6 +333,10 @@ async def complete_trip(trip_id: int, trip_data: schemas.TripComplete, db: Sessi
 @app.put("/api/trips/{trip_id}", response_model=schemas.Trip)
 async def update_trip(trip_id: int, trip_update: dict, db: Session = Depends(database.get_db)):
     """Update a trip."""
+    # Verify the new vehicle exists if the trip is being moved
+    if "vehicle_id" in trip_update and not crud.get_cached_vehicle(db, trip_update["vehicle_id"]):
+        raise HTTPException(status_code=404, detail="Vehicle not found")
+
     db_trip = crud.update_trip(db, trip_id, trip_update)
     if db_trip is None:
         raise HTTPException(status_code=404, detail="Trip not found")
@@ -228,3 +349,96 @@ async def delete_trip(trip_id: int, db: Session = Depends(database.get_db)):
     if db_trip is None:
         raise HTTPException(status_code=404, detail="Trip not found")
     return {"message": "Trip deleted successfully"}
+
+# Anomaly endpoints
+@app.get("/api/anomalies", response_model=schemas.AnomalyList)
+async def get_anomalies(vehicle_id: Optional[int] = None, kind: Optional[str] = None, skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
+    """Get data-quality anomalies found by the last scan."""
+    anomalies_found = anomalies.get_anomalies(db, vehicle_id=vehicle_id, kind=kind, skip=skip, limit=limit)
+    return {"anomalies": anomalies_found, "total": len(anomalies_found)}
+
+@app.post("/api/anomalies/scan", response_model=schemas.AnomalyScanResult)
+def scan_anomalies(full: bool = False, db: Session = Depends(database.get_db)):
+    """Rescan vehicles changed since the last run (or the whole fleet with full=true)."""
+    return anomalies.run_scan(db, full=full)
+
+# Report endpoints
+def _report_job_response(job: models.ReportJob) -> dict:
+    return {
+        "id": job.id,
+        "report_type": job.report_type,
+        "status": job.status,
+        "created_at": job.created_at,
+        "completed_at": job.completed_at,
+        "error": job.error,
+        "result": json.loads(job.result_json) if job.result_json else None,
+    }
+
+@app.post("/api/reports", response_model=schemas.ReportJob, status_code=202)
+def create_report(report: schemas.ReportRequest, db: Session = Depends(database.get_db)):
+    """Queue a report, reusing an identical running or up-to-date job."""
+    if report.report_type not in reports.REPORT_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unknown report type: {report.report_type}")
+    return _report_job_response(reports.enqueue_report(db, report))
+
+@app.get("/api/reports/{job_id}", response_model=schemas.ReportJob)
+async def get_report(job_id: int, format: str = "json", db: Session = Depends(database.get_db)):
+    """Get a report job's status, or its result once done."""
+    job = reports.get_report_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Report not found")
+    if format == "csv":
+        if job.status != "done":
+            raise HTTPException(status_code=409, detail=f"Report is {job.status}")
+        return Response(
+            content=job.result_csv,
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{job.report_type}-report-{job.id}.csv"'},
+        )
+    return _report_job_response(job)
+
+# Cost of ownership endpoints
+@app.get("/api/vehicles/{vehicle_id}/tco", response_model=schemas.VehicleTCO)
+async def get_vehicle_tco(vehicle_id: int, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None, db: Session = Depends(database.get_db)):
+    """Get total cost of ownership and cost per mile for a vehicle."""
+    vehicle_tco = tco.get_vehicle_tco(db, vehicle_id, start_date=start_date, end_date=end_date)
+    if vehicle_tco is None:
+        raise HTTPException(status_code=404, detail="Vehicle not found")
+    return vehicle_tco
+
+@app.get("/api/fleet/tco", response_model=schemas.FleetTCO)
+async def get_fleet_tco(start_date: Optional[datetime] = None, end_date: Optional[datetime] = None, active_only: bool = True, skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
+    """Rank vehicles by cost per mile."""
+    return tco.get_fleet_tco(db, start_date=start_date, end_date=end_date, active_only=active_only, skip=skip, limit=limit)
+
+# Backup endpoints
+@app.get("/api/backups", response_model=List[schemas.BackupSnapshot])
+async def get_backups():
+    """List stored snapshots, oldest first."""
+    return backup.load_manifest()
+
+@app.get("/api/backups/status", response_model=schemas.BackupStatus)
+async def get_backup_status():
+    """Get backup lag, duration and size of the latest snapshot."""
+    return backup.backup_status()
+
+def _create_snapshot_quietly():
+    try:
+        backup.create_snapshot()
+    except Exception:
+        # Reported through /api/backups/status
+        pass
+
+@app.post("/api/backups", status_code=202)
+async def create_backup(background_tasks: BackgroundTasks):
+    """Take a snapshot in the background."""
+    if backup.backup_status()["in_progress"]:
+        raise HTTPException(status_code=409, detail="A backup is already running")
+    background_tasks.add_task(_create_snapshot_quietly)
+    return {"message": "Backup started"}
+
+# Cache endpoints
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Get query cache size and hit-rate metrics."""
+    return query_cache.stats()
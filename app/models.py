@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from .database import Base
@@ -22,17 +22,19 @@ class Vehicle(Base):
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    deleted_at = Column(DateTime, nullable=True)  # set while children are purged in the background
 
     # Relationships
-    fillups = relationship("Fillup", back_populates="vehicle", cascade="all, delete-orphan")
-    maintenance_records = relationship("MaintenanceRecord", back_populates="vehicle", cascade="all, delete-orphan")
-    trips = relationship("Trip", back_populates="vehicle", cascade="all, delete-orphan")
+    fillups = relationship("Fillup", back_populates="vehicle", cascade="all, delete-orphan", passive_deletes=True)
+    maintenance_records = relationship("MaintenanceRecord", back_populates="vehicle", cascade="all, delete-orphan", passive_deletes=True)
+    trips = relationship("Trip", back_populates="vehicle", cascade="all, delete-orphan", passive_deletes=True)
 
 class Fillup(Base):
     __tablename__ = "fillups"
+    __table_args__ = (Index("ix_fillups_vehicle_date", "vehicle_id", "date"),)
 
     id = Column(Integer, primary_key=True, index=True)
-    vehicle_id = Column(Integer, ForeignKey("vehicles.id"))
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id", ondelete="CASCADE"))
     date = Column(DateTime, default=func.now())
     mileage = Column(Float)
     gallons = Column(Float)
@@ -49,9 +51,10 @@ class Fillup(Base):
 
 class MaintenanceRecord(Base):
     __tablename__ = "maintenance_records"
+    __table_args__ = (Index("ix_maintenance_records_vehicle_date", "vehicle_id", "date"),)
 
     id = Column(Integer, primary_key=True, index=True)
-    vehicle_id = Column(Integer, ForeignKey("vehicles.id"))
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id", ondelete="CASCADE"))
     date = Column(DateTime, default=func.now())
     mileage = Column(Float)
     service_type = Column(String)  # oil_change, tire_rotation, brake_service, etc.
@@ -68,9 +71,13 @@ class MaintenanceRecord(Base):
 
 class Trip(Base):
     __tablename__ = "trips"
+    __table_args__ = (
+        Index("ix_trips_vehicle_start_date", "vehicle_id", "start_date"),
+        Index("ix_trips_vehicle_end_date", "vehicle_id", "end_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    vehicle_id = Column(Integer, ForeignKey("vehicles.id"))
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id", ondelete="CASCADE"))
     start_date = Column(DateTime, default=func.now())
     end_date = Column(DateTime, nullable=True)
     start_mileage = Column(Float)
@@ -84,3 +91,51 @@ class Trip(Base):
 
     # Relationships
     vehicle = relationship("Vehicle", back_populates="trips")
+
+class VehicleRevision(Base):
+    """Counter bumped by every crud write to a vehicle or its records.
+
+    Rows deliberately outlive their vehicle: SQLite reuses the id of a deleted
+    vehicle, and the new one must continue from the old counter rather than
+    start over and collide with versions computed before the delete.
+    """
+    __tablename__ = "vehicle_revisions"
+
+    vehicle_id = Column(Integer, primary_key=True)
+    revision = Column(Integer, nullable=False, default=0)
+
+class Anomaly(Base):
+    __tablename__ = "anomalies"
+
+    id = Column(Integer, primary_key=True, index=True)
+    vehicle_id = Column(Integer, ForeignKey("vehicles.id", ondelete="CASCADE"), index=True)
+    kind = Column(String, index=True)  # odometer_rollback, mpg_outlier, duplicate_fillup, overlapping_trip
+    record_type = Column(String)  # fillup, trip
+    record_id = Column(Integer)
+    reason = Column(Text)
+    detected_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    vehicle = relationship("Vehicle")
+
+class AnomalyScanState(Base):
+    __tablename__ = "anomaly_scan_state"
+
+    vehicle_id = Column(Integer, primary_key=True)
+    fingerprint = Column(String)
+    scanned_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class ReportJob(Base):
+    __tablename__ = "report_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    report_type = Column(String)  # expense, mileage
+    params = Column(Text)  # canonical JSON of the request
+    params_key = Column(String, index=True)
+    data_version = Column(String, nullable=True)
+    status = Column(String, default="pending")  # pending, running, done, failed
+    result_json = Column(Text, nullable=True)
+    result_csv = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,253 @@
+"""Asynchronous report jobs.
+
+Reports are computed by a local process pool and stored in the
+``report_jobs`` table. Identical requests share one job while it runs, and
+a finished job is reused until the data it was computed from changes.
+"""
+import csv
+import hashlib
+import io
+import json
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from . import crud, database, models, schemas
+
+REPORT_TYPES = ("expense", "mileage")
+
+# IRS standard business mileage rate (USD per mile)
+IRS_RATE_PER_MILE = 0.67
+
+REPORT_WORKERS = 2
+
+_pool = None
+_enqueue_lock = threading.Lock()
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=REPORT_WORKERS, initializer=database.init_worker_process)
+    return _pool
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    """Drop a broken pool so the next submit starts a fresh one."""
+    global _pool
+    if _pool is pool:
+        _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def shutdown():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+def _vehicle_filter(query, column, vehicle_ids: Optional[List[int]]):
+    query = query.filter(crud.not_deleted(column))
+    return query.filter(column.in_(vehicle_ids)) if vehicle_ids else query
+
+def _date_filter(query, column, params: dict):
+    if params.get("start_date"):
+        query = query.filter(column >= datetime.fromisoformat(params["start_date"]))
+    if params.get("end_date"):
+        query = query.filter(column <= datetime.fromisoformat(params["end_date"]))
+    return query
+
+def data_version(db: Session, params: dict) -> str:
+    """Hash the revision of every vehicle a report reads.
+
+    The crud writes bump a vehicle's revision in the same transaction as any
+    change to it or its records, so edits that keep counts and totals the
+    same still produce a new version.
+    """
+    revisions = crud.get_vehicle_revisions(db, params.get("vehicle_ids"))
+    return hashlib.sha1(repr(revisions).encode()).hexdigest()
+
+def _vehicle_names(db: Session, vehicle_ids: Optional[List[int]]) -> dict:
+    return dict(_vehicle_filter(db.query(models.Vehicle.id, models.Vehicle.name), models.Vehicle.id, vehicle_ids))
+
+def build_expense_report(db: Session, params: dict) -> dict:
+    """Fuel and maintenance cost per vehicle."""
+    vehicle_ids = params.get("vehicle_ids")
+    fuel = _date_filter(_vehicle_filter(db.query(
+        models.Fillup.vehicle_id, func.count(models.Fillup.id),
+        func.total(models.Fillup.gallons), func.total(models.Fillup.total_cost),
+    ), models.Fillup.vehicle_id, vehicle_ids), models.Fillup.date, params).group_by(models.Fillup.vehicle_id)
+    maintenance = _date_filter(_vehicle_filter(db.query(
+        models.MaintenanceRecord.vehicle_id, func.count(models.MaintenanceRecord.id),
+        func.total(models.MaintenanceRecord.cost),
+    ), models.MaintenanceRecord.vehicle_id, vehicle_ids), models.MaintenanceRecord.date, params).group_by(models.MaintenanceRecord.vehicle_id)
+
+    fuel_by_vehicle = {row[0]: row[1:] for row in fuel}
+    maintenance_by_vehicle = {row[0]: row[1:] for row in maintenance}
+
+    rows = []
+    for vehicle_id, name in sorted(_vehicle_names(db, vehicle_ids).items()):
+        fillups, gallons, fuel_cost = fuel_by_vehicle.get(vehicle_id, (0, 0.0, 0.0))
+        records, maintenance_cost = maintenance_by_vehicle.get(vehicle_id, (0, 0.0))
+        rows.append({
+            "vehicle_id": vehicle_id,
+            "vehicle_name": name,
+            "fillups": fillups,
+            "gallons": round(gallons, 2),
+            "fuel_cost": round(fuel_cost, 2),
+            "maintenance_records": records,
+            "maintenance_cost": round(maintenance_cost, 2),
+            "total_cost": round(fuel_cost + maintenance_cost, 2),
+        })
+
+    totals = {key: round(sum(row[key] for row in rows), 2)
+              for key in ("fillups", "gallons", "fuel_cost", "maintenance_records", "maintenance_cost", "total_cost")}
+    return {"rows": rows, "totals": totals}
+
+def build_mileage_report(db: Session, params: dict) -> dict:
+    """Trip miles per vehicle and purpose, with the IRS business deduction."""
+    vehicle_ids = params.get("vehicle_ids")
+    rate = params.get("rate_per_mile") or IRS_RATE_PER_MILE
+    purpose = func.coalesce(models.Trip.purpose, "unspecified")
+    trips = _date_filter(_vehicle_filter(db.query(
+        models.Trip.vehicle_id, purpose, func.count(models.Trip.id), func.total(models.Trip.distance),
+    ), models.Trip.vehicle_id, vehicle_ids), models.Trip.start_date, params).group_by(
+        models.Trip.vehicle_id, purpose
+    ).order_by(models.Trip.vehicle_id, purpose)
+
+    names = _vehicle_names(db, vehicle_ids)
+    rows = []
+    by_purpose = {}
+    for vehicle_id, trip_purpose, count, miles in trips:
+        deduction = miles * rate if trip_purpose == "business" else 0.0
+        rows.append({
+            "vehicle_id": vehicle_id,
+            "vehicle_name": names.get(vehicle_id),
+            "purpose": trip_purpose,
+            "trips": count,
+            "miles": round(miles, 1),
+            "deduction": round(deduction, 2),
+        })
+        by_purpose[trip_purpose] = round(by_purpose.get(trip_purpose, 0.0) + miles, 1)
+
+    totals = {
+        "trips": sum(row["trips"] for row in rows),
+        "miles": round(sum(row["miles"] for row in rows), 1),
+        "deduction": round(sum(row["deduction"] for row in rows), 2),
+        "rate_per_mile": rate,
+        "miles_by_purpose": by_purpose,
+    }
+    return {"rows": rows, "totals": totals}
+
+REPORT_BUILDERS = {
+    "expense": build_expense_report,
+    "mileage": build_mileage_report,
+}
+
+def _to_csv(rows: List[dict]) -> str:
+    output = io.StringIO()
+    if rows:
+        writer = csv.DictWriter(output, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return output.getvalue()
+
+def _compute_report(report_type: str, params: dict) -> dict:
+    """Run in a pool worker; returns the report and its CSV rendering."""
+    db = database.SessionLocal()
+    try:
+        report = REPORT_BUILDERS[report_type](db, params)
+        report["report_type"] = report_type
+        report["params"] = params
+        return {"json": json.dumps(report), "csv": _to_csv(report["rows"])}
+    finally:
+        db.close()
+
+def _store_result(job_id: int, future, pool: ProcessPoolExecutor):
+    db = database.SessionLocal()
+    try:
+        job = db.query(models.ReportJob).filter(models.ReportJob.id == job_id).first()
+        if job is None:
+            return
+        try:
+            result = future.result()
+        except Exception as exc:
+            if isinstance(exc, BrokenProcessPool):
+                _discard_pool(pool)
+            job.status = "failed"
+            job.error = str(exc) or exc.__class__.__name__
+        else:
+            job.status = "done"
+            job.result_json = result["json"]
+            job.result_csv = result["csv"]
+        job.completed_at = datetime.now()
+        db.commit()
+    finally:
+        db.close()
+
+def _submit(db: Session, job: models.ReportJob):
+    job.status = "running"
+    db.commit()
+    # A worker killed mid-job (e.g. by the OOM killer) breaks the whole pool;
+    # replace it once, then fail the job rather than leave it "running"
+    future = None
+    for attempt in range(2):
+        pool = _get_pool()
+        try:
+            future = pool.submit(_compute_report, job.report_type, json.loads(job.params))
+            break
+        except BrokenProcessPool as exc:
+            _discard_pool(pool)
+            error = exc
+    if future is None:
+        job.status = "failed"
+        job.error = str(error) or error.__class__.__name__
+        job.completed_at = datetime.now()
+        db.commit()
+        return
+    future.add_done_callback(lambda f, job_id=job.id, pool=pool: _store_result(job_id, f, pool))
+
+def _canonical_params(request: schemas.ReportRequest) -> dict:
+    params = request.model_dump(mode="json", exclude={"report_type"})
+    if params["vehicle_ids"]:
+        params["vehicle_ids"] = sorted(set(params["vehicle_ids"]))
+    return params
+
+def enqueue_report(db: Session, request: schemas.ReportRequest) -> models.ReportJob:
+    """Return a running or still-valid job for these parameters, or start a new one."""
+    params = _canonical_params(request)
+    params_json = json.dumps(params, sort_keys=True)
+    params_key = hashlib.sha1(f"{request.report_type}:{params_json}".encode()).hexdigest()
+
+    with _enqueue_lock:
+        version = data_version(db, params)
+        existing = db.query(models.ReportJob).filter(
+            models.ReportJob.params_key == params_key,
+            models.ReportJob.data_version == version,
+            models.ReportJob.status.in_(("pending", "running", "done")),
+        ).order_by(models.ReportJob.id.desc()).first()
+        if existing:
+            return existing
+
+        job = models.ReportJob(
+            report_type=request.report_type,
+            params=params_json,
+            params_key=params_key,
+            data_version=version,
+            status="pending",
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        _submit(db, job)
+    return job
+
+def get_report_job(db: Session, job_id: int):
+    return db.query(models.ReportJob).filter(models.ReportJob.id == job_id).first()
+
+def resume_pending(db: Session):
+    """Resubmit jobs that were queued when the previous process exited."""
+    for job in db.query(models.ReportJob).filter(models.ReportJob.status.in_(("pending", "running"))).all():
+        _submit(db, job)
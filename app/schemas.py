@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 class VehicleBase(BaseModel):
@@ -132,3 +132,99 @@ class DashboardStats(BaseModel):
     average_mpg: Optional[float]
     recent_fillups: int
     upcoming_services: int
+
+class Anomaly(BaseModel):
+    id: int
+    vehicle_id: int
+    kind: str
+    record_type: str
+    record_id: int
+    reason: str
+    detected_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class AnomalyList(BaseModel):
+    anomalies: List[Anomaly]
+    total: int
+
+class AnomalyScanResult(BaseModel):
+    vehicles_scanned: int
+    anomalies_found: int
+
+class ReportRequest(BaseModel):
+    report_type: str  # expense, mileage
+    vehicle_ids: Optional[List[int]] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    rate_per_mile: Optional[float] = None
+
+class ReportJob(BaseModel):
+    id: int
+    report_type: str
+    status: str
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+    error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+
+class VehicleTCO(BaseModel):
+    vehicle_id: int
+    vehicle_name: str
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    fuel_cost: float
+    maintenance_cost: float
+    depreciation: float
+    total_cost: float
+    distance: float
+    cost_per_mile: Optional[float]
+
+class FleetTCO(BaseModel):
+    vehicles: List[VehicleTCO]
+    fleet_total_cost: float
+    fleet_distance: float
+    fleet_cost_per_mile: Optional[float]
+
+class FillupPage(BaseModel):
+    items: List[Fillup]
+    count: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+class MaintenanceRecordPage(BaseModel):
+    items: List[MaintenanceRecord]
+    count: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+class TripPage(BaseModel):
+    items: List[Trip]
+    count: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+class VehicleDetails(BaseModel):
+    vehicle: Vehicle
+    fillups: FillupPage
+    maintenance_records: MaintenanceRecordPage
+    trips: TripPage
+
+class BackupSnapshot(BaseModel):
+    name: str
+    created_at: datetime
+    sha256: str
+    size_bytes: int
+    compressed_bytes: int
+    duration_seconds: float
+
+class BackupStatus(BaseModel):
+    snapshots: int
+    last_backup_at: Optional[datetime]
+    last_duration_seconds: Optional[float]
+    last_size_bytes: Optional[int]
+    last_compressed_bytes: Optional[int]
+    last_checked_at: Optional[datetime]
+    last_check_duration_seconds: Optional[float]
+    lag_seconds: Optional[float]
+    interval_seconds: int
+    in_progress: bool
+    last_error: Optional[str]
@@ -0,0 +1,135 @@
+"""Total cost of ownership.
+
+Fuel, maintenance and straight-line depreciation are combined with the
+distance driven (odometer spread) over a date window. Everything is
+aggregated in SQLite over the ``(vehicle_id, date)`` indexes, so the fleet
+ranking is a single query regardless of history length.
+"""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import and_, case, func, literal, nulls_last, select, union_all
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Straight-line depreciation down to a salvage value
+DEPRECIATION_YEARS = 5
+SALVAGE_FRACTION = 0.2
+
+DAYS_PER_YEAR = 365.25
+
+def _window(column, start_date: Optional[datetime], end_date: Optional[datetime]):
+    conditions = []
+    if start_date:
+        conditions.append(column >= start_date)
+    if end_date:
+        conditions.append(column <= end_date)
+    return conditions
+
+def _tco_query(start_date: Optional[datetime], end_date: Optional[datetime], vehicle_id: Optional[int] = None):
+    def scoped(column, vehicle_column):
+        conditions = _window(column, start_date, end_date)
+        if vehicle_id is not None:
+            conditions.append(vehicle_column == vehicle_id)
+        return conditions
+
+    Fillup, Maintenance, Trip, Vehicle = models.Fillup, models.MaintenanceRecord, models.Trip, models.Vehicle
+
+    fuel = select(
+        Fillup.vehicle_id, func.total(Fillup.total_cost).label("fuel_cost"),
+    ).where(*scoped(Fillup.date, Fillup.vehicle_id)).group_by(Fillup.vehicle_id).subquery()
+
+    maintenance = select(
+        Maintenance.vehicle_id, func.total(Maintenance.cost).label("maintenance_cost"),
+    ).where(*scoped(Maintenance.date, Maintenance.vehicle_id)).group_by(Maintenance.vehicle_id).subquery()
+
+    readings = union_all(
+        select(Fillup.vehicle_id, Fillup.mileage.label("reading")).where(*scoped(Fillup.date, Fillup.vehicle_id)),
+        select(Maintenance.vehicle_id, Maintenance.mileage).where(*scoped(Maintenance.date, Maintenance.vehicle_id)),
+        select(Trip.vehicle_id, Trip.start_mileage).where(*scoped(Trip.start_date, Trip.vehicle_id)),
+        select(Trip.vehicle_id, Trip.end_mileage).where(Trip.end_mileage.isnot(None), *scoped(Trip.end_date, Trip.vehicle_id)),
+    ).subquery()
+    odometer = select(
+        readings.c.vehicle_id, (func.max(readings.c.reading) - func.min(readings.c.reading)).label("distance"),
+    ).group_by(readings.c.vehicle_id).subquery()
+
+    # Depreciation accrues between purchase and the end of the schedule,
+    # clipped to the requested window
+    purchased = func.julianday(Vehicle.purchase_date)
+    accrual_start = func.max(purchased, func.julianday(start_date)) if start_date else purchased
+    accrual_end = func.min(
+        purchased + DEPRECIATION_YEARS * DAYS_PER_YEAR,
+        func.julianday(end_date or datetime.now()),
+    )
+    daily_depreciation = Vehicle.purchase_price * (1 - SALVAGE_FRACTION) / (DEPRECIATION_YEARS * DAYS_PER_YEAR)
+    depreciation = case(
+        (and_(Vehicle.purchase_price.isnot(None), Vehicle.purchase_date.isnot(None)),
+         daily_depreciation * func.max(accrual_end - accrual_start, 0)),
+        else_=literal(0.0),
+    )
+
+    fuel_cost = func.coalesce(fuel.c.fuel_cost, 0.0)
+    maintenance_cost = func.coalesce(maintenance.c.maintenance_cost, 0.0)
+    distance = func.coalesce(odometer.c.distance, 0.0)
+    total_cost = fuel_cost + maintenance_cost + depreciation
+
+    query = select(
+        Vehicle.id.label("vehicle_id"),
+        Vehicle.name.label("vehicle_name"),
+        fuel_cost.label("fuel_cost"),
+        maintenance_cost.label("maintenance_cost"),
+        depreciation.label("depreciation"),
+        total_cost.label("total_cost"),
+        distance.label("distance"),
+        (total_cost / func.nullif(distance, 0)).label("cost_per_mile"),
+    ).select_from(Vehicle).outerjoin(fuel, fuel.c.vehicle_id == Vehicle.id).outerjoin(
+        maintenance, maintenance.c.vehicle_id == Vehicle.id
+    ).outerjoin(odometer, odometer.c.vehicle_id == Vehicle.id).where(Vehicle.deleted_at.is_(None))
+
+    if vehicle_id is not None:
+        query = query.where(Vehicle.id == vehicle_id)
+    return query
+
+def _row_to_dict(row, start_date, end_date) -> dict:
+    return {
+        "vehicle_id": row.vehicle_id,
+        "vehicle_name": row.vehicle_name,
+        "start_date": start_date,
+        "end_date": end_date,
+        "fuel_cost": round(row.fuel_cost, 2),
+        "maintenance_cost": round(row.maintenance_cost, 2),
+        "depreciation": round(row.depreciation, 2),
+        "total_cost": round(row.total_cost, 2),
+        "distance": round(row.distance, 1),
+        "cost_per_mile": round(row.cost_per_mile, 3) if row.cost_per_mile is not None else None,
+    }
+
+def get_vehicle_tco(db: Session, vehicle_id: int, start_date: datetime = None, end_date: datetime = None):
+    """Cost of ownership for one vehicle over an optional date window."""
+    row = db.execute(_tco_query(start_date, end_date, vehicle_id)).first()
+    if row is None:
+        return None
+    return _row_to_dict(row, start_date, end_date)
+
+def get_fleet_tco(db: Session, start_date: datetime = None, end_date: datetime = None,
+                  active_only: bool = True, skip: int = 0, limit: int = 100):
+    """Vehicles ranked by cost per mile (cheapest first), with fleet totals."""
+    tco = _tco_query(start_date, end_date)
+    if active_only:
+        tco = tco.where(models.Vehicle.is_active == True)
+    tco = tco.subquery()
+
+    rows = db.execute(
+        select(tco).order_by(nulls_last(tco.c.cost_per_mile), tco.c.vehicle_id).offset(skip).limit(limit)
+    ).all()
+    fleet_cost, fleet_distance = db.execute(
+        select(func.total(tco.c.total_cost), func.total(tco.c.distance))
+    ).one()
+
+    return {
+        "vehicles": [_row_to_dict(row, start_date, end_date) for row in rows],
+        "fleet_total_cost": round(fleet_cost, 2),
+        "fleet_distance": round(fleet_distance, 1),
+        "fleet_cost_per_mile": round(fleet_cost / fleet_distance, 3) if fleet_distance > 0 else None,
+    }
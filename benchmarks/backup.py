@@ -0,0 +1,118 @@
+"""Measure online backup throughput and its effect on write latency.
+
+Builds a throwaway database of the requested size, then times single
+fillup inserts (one transaction each, like the API) with and without a
+concurrent ``backup.copy_online`` running. The copy is made and discarded
+the way ``create_snapshot`` does it, and writes are also timed for
+``--settle-seconds`` afterwards so deferred disk flushes are counted.
+
+Run from the repository root; the request-scale check is multi-GB:
+
+    python -m benchmarks.backup --size-mb 4096
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine
+
+from app import backup, models
+
+NOTE = "x" * 900
+
+def _build(path: str, size_mb: int):
+    engine = create_engine(f"sqlite:///{path}")
+    models.Base.metadata.create_all(bind=engine)
+    engine.dispose()
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("INSERT INTO vehicles (id, name, make, model, year, current_mileage) VALUES (1, 'bench', 'Bench', 'Car', 2020, 0)")
+    target = size_mb * 1024 * 1024
+    mileage = 0.0
+    while os.path.getsize(path) < target:
+        rows = []
+        for _ in range(10000):
+            mileage += 300
+            rows.append((1, "2024-01-01 00:00:00.000000", mileage, 10.0, 3.0, 30.0, 1, NOTE))
+        conn.executemany(
+            "INSERT INTO fillups (vehicle_id, date, mileage, gallons, price_per_gallon, total_cost, is_full_tank, notes) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.commit()
+    conn.close()
+
+def _write_latencies(path: str, stop: threading.Event, latencies: list):
+    conn = sqlite3.connect(path, timeout=30)
+    mileage = 1e9
+    while not stop.is_set():
+        mileage += 1
+        started = time.perf_counter()
+        conn.execute(
+            "INSERT INTO fillups (vehicle_id, date, mileage, gallons, price_per_gallon, total_cost, is_full_tank) VALUES (1, '2024-06-01 00:00:00.000000', ?, 10, 3, 30, 1)",
+            (mileage,),
+        )
+        conn.commit()
+        latencies.append((time.perf_counter() - started) * 1000)
+        time.sleep(0.01)
+    conn.close()
+
+def _summary(latencies: list) -> str:
+    if not latencies:
+        return "no writes"
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return f"{len(ordered)} writes, p50 {statistics.median(ordered):.2f} ms, p99 {p99:.2f} ms, max {ordered[-1]:.2f} ms"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=2048)
+    parser.add_argument("--pages", type=int, default=backup.PAGES_PER_STEP)
+    parser.add_argument("--pause", type=float, default=backup.STEP_PAUSE_SECONDS)
+    parser.add_argument("--baseline-seconds", type=float, default=5.0)
+    parser.add_argument("--settle-seconds", type=float, default=5.0)
+    parser.add_argument("--dir", default=None, help="where to build the database (needs about twice --size-mb free)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        source = os.path.join(tmp, "bench.db")
+        target = os.path.join(tmp, "snapshot.db")
+        print(f"Building {args.size_mb} MB database...")
+        _build(source, args.size_mb)
+        size_mb = os.path.getsize(source) / (1024 * 1024)
+
+        stop = threading.Event()
+        baseline = []
+        writer = threading.Thread(target=_write_latencies, args=(source, stop, baseline))
+        writer.start()
+        time.sleep(args.baseline_seconds)
+        stop.set()
+        writer.join()
+
+        stop = threading.Event()
+        during = []
+        writer = threading.Thread(target=_write_latencies, args=(source, stop, during))
+        writer.start()
+        started = time.perf_counter()
+        backup.copy_online(source, target, pages=args.pages, pause=args.pause, durable=False)
+        elapsed = time.perf_counter() - started
+        # The WAL cannot be checkpointed past the pinned read snapshot, so
+        # it grows for as long as the copy runs
+        wal_mb = os.path.getsize(source + "-wal") / (1024 * 1024) if os.path.exists(source + "-wal") else 0.0
+        os.remove(target)
+        time.sleep(args.settle_seconds)
+        stop.set()
+        writer.join()
+
+        print(f"Backup of {size_mb:,.0f} MB in {elapsed:.1f}s ({size_mb / elapsed:,.1f} MB/s), "
+              f"{args.pages} pages per step, {args.pause * 1000:.1f} ms pause")
+        print(f"WAL pinned for {elapsed:.1f}s, {wal_mb:,.1f} MB at the end of the copy")
+        print(f"Writes without backup: {_summary(baseline)}")
+        print(f"Writes during backup and {args.settle_seconds:g}s after: {_summary(during)}")
+
+if __name__ == "__main__":
+    main()
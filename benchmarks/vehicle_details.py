@@ -0,0 +1,88 @@
+"""Compare the vehicle details query against a joinedload of every collection.
+
+Loading fillups, maintenance records and trips with joinedload at once
+returns fillups x maintenance x trips rows; the bounded per-collection
+queries in ``crud.get_vehicle_with_details`` stay roughly flat as history grows.
+
+Run from the repository root:
+
+    python -m benchmarks.vehicle_details
+"""
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import joinedload, sessionmaker
+
+from app import crud, models
+
+SIZES = (10, 20, 40, 80)
+
+def _populate(db, records: int):
+    vehicle = models.Vehicle(name=f"bench-{records}", make="Bench", model="Car", year=2020)
+    db.add(vehicle)
+    db.flush()
+    start = datetime(2020, 1, 1)
+    for i in range(records):
+        day = start + timedelta(days=i)
+        db.add(models.Fillup(vehicle_id=vehicle.id, date=day, mileage=i * 300.0, gallons=10.0,
+                             price_per_gallon=3.0, total_cost=30.0))
+        db.add(models.MaintenanceRecord(vehicle_id=vehicle.id, date=day, mileage=i * 300.0,
+                                        service_type="oil_change", description="Oil change", cost=50.0))
+        db.add(models.Trip(vehicle_id=vehicle.id, start_date=day, end_date=day + timedelta(hours=1),
+                           start_mileage=i * 300.0, end_mileage=i * 300.0 + 20, distance=20.0))
+    db.commit()
+    return vehicle.id
+
+def _joinedload_rows(db, vehicle_id: int) -> int:
+    """Rows the joinedload query pulls back for one vehicle."""
+    return db.query(func.count()).select_from(models.Vehicle).outerjoin(
+        models.Fillup, models.Fillup.vehicle_id == models.Vehicle.id
+    ).outerjoin(
+        models.MaintenanceRecord, models.MaintenanceRecord.vehicle_id == models.Vehicle.id
+    ).outerjoin(
+        models.Trip, models.Trip.vehicle_id == models.Vehicle.id
+    ).filter(models.Vehicle.id == vehicle_id).scalar()
+
+def _time(fn, repeat: int = 3) -> float:
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        models.Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+
+        print(f"{'records':>8} {'joined rows':>12} {'joinedload ms':>14} {'details ms':>11}")
+        for size in SIZES:
+            db = Session()
+            try:
+                vehicle_id = _populate(db, size)
+
+                def load_joined():
+                    db.expunge_all()
+                    db.query(models.Vehicle).options(
+                        joinedload(models.Vehicle.fillups),
+                        joinedload(models.Vehicle.maintenance_records),
+                        joinedload(models.Vehicle.trips),
+                    ).filter(models.Vehicle.id == vehicle_id).first()
+
+                def load_details():
+                    db.expunge_all()
+                    crud.get_vehicle_with_details(db, vehicle_id)
+
+                rows = _joinedload_rows(db, vehicle_id)
+                print(f"{size:>8} {rows:>12} {_time(load_joined, repeat=1):>14.1f} {_time(load_details):>11.1f}")
+            finally:
+                db.close()
+
+if __name__ == "__main__":
+    main()
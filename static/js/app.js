@@ -2,7 +2,14 @@ const API_BASE = window.location.origin;
 
 // Global state
 let currentVehicles = [];
+let vehiclesLoaded = null;
 let activeTrip = null;
+let fillupsList = null;
+let maintenanceList = null;
+let tripsList = null;
+
+// Rows fetched per request when scrolling long lists
+const PAGE_SIZE = 50;
 
 // DOM Elements
 const tabs = document.querySelectorAll('.tab-button');
@@ -45,6 +52,13 @@ function showTab(tabName) {
     if (tabContent) {
         tabContent.classList.add('active');
     }
+
+    // Retries the vehicle list if the first load failed
+    if (tabName === 'vehicles') ensureVehiclesLoaded();
+
+    // Virtual lists can't measure rows while their tab is hidden
+    const pagedList = { fillups: fillupsList, maintenance: maintenanceList, trips: tripsList }[tabName];
+    if (pagedList) pagedList.list.refresh();
 }
 
 function showMessage(message, type = 'success') {
@@ -117,6 +131,228 @@ function getTripPurposeIcon(purpose) {
     return icons[purpose] || '📍';
 }
 
+function findVehicle(vehicleId) {
+    return currentVehicles.find(vehicle => vehicle.id === vehicleId);
+}
+
+function getVehicleName(vehicleId) {
+    return findVehicle(vehicleId)?.name || 'Unknown Vehicle';
+}
+
+// Virtualized lists
+// Renders only the items inside the scroll viewport (plus a few either side);
+// spacers stand in for the rest. Item heights are measured as they render.
+class VirtualList {
+    constructor(element, renderItem, { estimatedHeight = 200, overscan = 4, onNearEnd = null } = {}) {
+        this.element = element;
+        this.renderItem = renderItem;
+        this.estimatedHeight = estimatedHeight;
+        this.overscan = overscan;
+        this.onNearEnd = onNearEnd;
+        this.items = [];
+        this.heights = new WeakMap();
+        this.gap = 0;
+        // offsets[i] is the top of item i and offsets[items.length] the total
+        // height; entries past validOffsets are recomputed on the next render
+        this.offsets = [0];
+        this.validOffsets = 0;
+        this.renderedRange = null;
+        this.frame = null;
+
+        this.topSpacer = document.createElement('div');
+        this.itemsEl = document.createElement('div');
+        this.itemsEl.className = 'virtual-items';
+        this.bottomSpacer = document.createElement('div');
+        element.classList.add('virtual-list');
+        element.replaceChildren(this.topSpacer, this.itemsEl, this.bottomSpacer);
+
+        element.addEventListener('scroll', () => this.scheduleRender());
+        window.addEventListener('resize', () => this.refresh());
+    }
+
+    setItems(items) {
+        // Lists mostly grow at the end, so offsets before the first changed item
+        // are kept; callers pass a new array rather than mutating the old one
+        let unchanged = 0;
+        while (unchanged < items.length && unchanged < this.items.length && items[unchanged] === this.items[unchanged]) {
+            unchanged++;
+        }
+        this.invalidateOffsets(unchanged);
+        this.items = items;
+        this.refresh();
+    }
+
+    refresh() {
+        this.renderedRange = null;
+        this.scheduleRender();
+    }
+
+    scheduleRender() {
+        if (this.frame) return;
+        this.frame = requestAnimationFrame(() => {
+            this.frame = null;
+            this.render();
+        });
+    }
+
+    invalidateOffsets(index) {
+        this.validOffsets = Math.min(this.validOffsets, index);
+    }
+
+    updateOffsets() {
+        const count = this.items.length;
+        this.offsets.length = count + 1;
+        for (let i = this.validOffsets; i < count; i++) {
+            this.offsets[i + 1] = this.offsets[i] + (this.heights.get(this.items[i]) ?? this.estimatedHeight) + this.gap;
+        }
+        this.validOffsets = count;
+    }
+
+    // First index in [low, high) whose offset is at least position, else high
+    offsetIndex(position, low, high) {
+        while (low < high) {
+            const mid = (low + high) >> 1;
+            if (this.offsets[mid] < position) {
+                low = mid + 1;
+            } else {
+                high = mid;
+            }
+        }
+        return low;
+    }
+
+    render() {
+        const viewportHeight = this.element.clientHeight;
+        if (viewportHeight === 0) return;  // hidden tab; rendered when shown
+
+        const gap = parseFloat(getComputedStyle(this.itemsEl).rowGap) || 0;
+        if (gap !== this.gap) {
+            this.gap = gap;
+            this.invalidateOffsets(0);
+        }
+        this.updateOffsets();
+
+        const count = this.items.length;
+        const scrollTop = this.element.scrollTop;
+        const first = this.offsetIndex(scrollTop, 1, count + 1) - 1;
+        const last = this.offsetIndex(scrollTop + viewportHeight, first, count);
+        const start = Math.max(0, first - this.overscan);
+        const end = Math.min(count, last + this.overscan);
+
+        const range = `${start}:${end}`;
+        if (range !== this.renderedRange) {
+            this.renderedRange = range;
+            const visible = this.items.slice(start, end);
+            this.itemsEl.replaceChildren(...visible.map(item => this.renderItem(item)));
+            Array.from(this.itemsEl.children).forEach((child, index) => {
+                const height = child.getBoundingClientRect().height;
+                if (this.heights.get(visible[index]) !== height) {
+                    this.heights.set(visible[index], height);
+                    this.invalidateOffsets(start + index);
+                }
+            });
+            this.updateOffsets();
+        }
+
+        const total = this.offsets[count];
+        this.topSpacer.style.height = `${this.offsets[start]}px`;
+        this.bottomSpacer.style.height = `${total - this.offsets[end]}px`;
+
+        if (this.onNearEnd && scrollTop + viewportHeight >= total - viewportHeight) {
+            this.onNearEnd();
+        }
+    }
+}
+
+// A virtualized list fed page by page from a skip/limit API endpoint,
+// kept sorted newest first and updated locally after creates and deletes
+function createPagedList({ name, url, itemsKey, dateKey, renderItem }) {
+    const loading = document.getElementById(`${name}-loading`);
+    const empty = document.getElementById(`${name}-empty`);
+    const listEl = document.getElementById(`${name}-list`);
+
+    const paged = {
+        items: [],
+        hasMore: true,
+        fetching: false,
+        generation: 0,
+        list: null,
+    };
+    paged.list = new VirtualList(listEl, renderItem, { onNearEnd: () => paged.loadMore() });
+
+    paged.updateVisibility = () => {
+        hideElement(loading);
+        if (paged.items.length === 0 && !paged.hasMore) {
+            showElement(empty);
+            hideElement(listEl);
+        } else {
+            hideElement(empty);
+            showElement(listEl);
+        }
+        paged.list.setItems(paged.items);
+    };
+
+    paged.reset = async () => {
+        paged.generation++;
+        paged.items = [];
+        paged.hasMore = true;
+        paged.fetching = false;
+        showElement(loading);
+        hideElement(empty);
+        hideElement(listEl);
+        listEl.scrollTop = 0;
+        await paged.loadMore();
+    };
+
+    paged.loadMore = async () => {
+        if (paged.fetching || !paged.hasMore) return;
+        paged.fetching = true;
+        const generation = paged.generation;
+        try {
+            const response = await fetch(`${API_BASE}${url}?skip=${paged.items.length}&limit=${PAGE_SIZE}`);
+            if (!response.ok) {
+                throw new Error(`Failed to load ${name}`);
+            }
+            const data = await response.json();
+            if (generation !== paged.generation) return;  // reset while in flight
+            const known = new Set(paged.items.map(item => item.id));
+            paged.items = paged.items.concat(data[itemsKey].filter(item => !known.has(item.id)));
+            paged.hasMore = data[itemsKey].length === PAGE_SIZE;
+            paged.updateVisibility();
+        } catch (error) {
+            hideElement(loading);
+            showMessage(`Failed to load ${name}`, 'error');
+            console.error(`Error loading ${name}:`, error);
+        } finally {
+            if (generation === paged.generation) paged.fetching = false;
+        }
+    };
+
+    paged.insert = (item) => {
+        const date = new Date(item[dateKey]);
+        const index = paged.items.findIndex(existing => new Date(existing[dateKey]) < date);
+        if (index !== -1) {
+            paged.items = [...paged.items.slice(0, index), item, ...paged.items.slice(index)];
+        } else if (!paged.hasMore) {
+            paged.items = [...paged.items, item];
+        }
+        // Otherwise it sorts after the loaded pages and arrives with a later page
+        paged.updateVisibility();
+    };
+
+    paged.replace = (item) => {
+        paged.items = paged.items.map(existing => existing.id === item.id ? item : existing);
+        paged.updateVisibility();
+    };
+
+    paged.removeWhere = (predicate) => {
+        paged.items = paged.items.filter(item => !predicate(item));
+        paged.updateVisibility();
+    };
+
+    return paged;
+}
+
 // Dashboard functions
 async function loadDashboardStats() {
     try {
@@ -184,9 +420,11 @@ async function createVehicle(event) {
             throw new Error(error.detail || 'Failed to create vehicle');
         }
 
+        const vehicle = await response.json();
         showMessage('Vehicle added successfully!');
         hideVehicleForm();
-        loadVehicles();
+        currentVehicles.push(vehicle);
+        displayVehicles(currentVehicles);
         loadDashboardStats();
     } catch (error) {
         showMessage(error.message, 'error');
@@ -195,16 +433,36 @@ async function createVehicle(event) {
 
 async function loadVehicles() {
     try {
-        const response = await fetch(`${API_BASE}/api/vehicles`);
-        if (response.ok) {
+        const vehicles = [];
+        while (true) {
+            const response = await fetch(`${API_BASE}/api/vehicles?skip=${vehicles.length}&limit=100`);
+            if (!response.ok) {
+                throw new Error('Failed to load vehicles');
+            }
             const data = await response.json();
-            currentVehicles = data.vehicles;
-            displayVehicles(data.vehicles);
+            vehicles.push(...data.vehicles);
+            if (data.vehicles.length < 100) break;
         }
+        currentVehicles = vehicles;
+        displayVehicles(currentVehicles);
+        return true;
     } catch (error) {
         console.error('Error loading vehicles:', error);
         showMessage('Failed to load vehicles', 'error');
+        return false;
+    }
+}
+
+// The vehicle list is fetched once per session; creates and deletes update it locally.
+// A failed fetch is not cached, so the next call tries again.
+function ensureVehiclesLoaded() {
+    if (!vehiclesLoaded) {
+        vehiclesLoaded = loadVehicles().then(loaded => {
+            if (!loaded) vehiclesLoaded = null;
+            return loaded;
+        });
     }
+    return vehiclesLoaded;
 }
 
 function displayVehicles(vehicles) {
@@ -322,7 +580,14 @@ async function deleteVehicle(vehicleId) {
         }
 
         showMessage('Vehicle deleted successfully');
-        loadVehicles();
+        currentVehicles = currentVehicles.filter(vehicle => vehicle.id !== vehicleId);
+        displayVehicles(currentVehicles);
+        [fillupsList, maintenanceList, tripsList].forEach(pagedList => {
+            pagedList.removeWhere(item => item.vehicle_id === vehicleId);
+        });
+        if (activeTrip && activeTrip.vehicle_id === vehicleId) {
+            stopActiveTrip();
+        }
         loadDashboardStats();
     } catch (error) {
         showMessage(error.message, 'error');
@@ -386,10 +651,15 @@ async function createFillup(event) {
             throw new Error(error.detail || 'Failed to add fill-up');
         }
 
+        const fillup = await response.json();
         showMessage('Fill-up added successfully!');
         hideFillupForm();
-        loadFillups();
-        loadVehicles();
+        fillupsList.insert(fillup);
+        const vehicle = findVehicle(fillup.vehicle_id);
+        if (vehicle && fillup.mileage > vehicle.current_mileage) {
+            vehicle.current_mileage = fillup.mileage;
+            displayVehicles(currentVehicles);
+        }
         loadDashboardStats();
     } catch (error) {
         showMessage(error.message, 'error');
@@ -397,86 +667,52 @@ async function createFillup(event) {
 }
 
 async function loadFillups() {
-    const container = document.getElementById('fillups-container');
-    const loading = document.getElementById('fillups-loading');
-    const empty = document.getElementById('fillups-empty');
-    const list = document.getElementById('fillups-list');
-
-    try {
-        showElement(loading);
-        hideElement(empty);
-        hideElement(list);
-
-        const response = await fetch(`${API_BASE}/api/fillups`);
-        if (!response.ok) {
-            throw new Error('Failed to load fill-ups');
-        }
-
-        const data = await response.json();
-        hideElement(loading);
-
-        if (data.fillups.length === 0) {
-            showElement(empty);
-        } else {
-            displayFillups(data.fillups);
-        }
-    } catch (error) {
-        hideElement(loading);
-        showMessage('Failed to load fill-ups', 'error');
-        console.error('Error loading fill-ups:', error);
-    }
+    await fillupsList.reset();
 }
 
-function displayFillups(fillups) {
-    const list = document.getElementById('fillups-list');
-    list.innerHTML = '';
-
-    fillups.forEach(fillup => {
-        const fillupItem = document.createElement('div');
-        fillupItem.className = 'fillup-item';
+function renderFillupItem(fillup) {
+    const fillupItem = document.createElement('div');
+    fillupItem.className = 'fillup-item';
 
-        const mpg = 'N/A';
+    const mpg = 'N/A';
 
-        fillupItem.innerHTML = `
-            <div class="fillup-header">
-                <div>
-                    <div class="fillup-vehicle">${fillup.vehicle?.name || 'Unknown Vehicle'}</div>
-                    <div class="fillup-date">${formatDateTime(fillup.date)}</div>
-                </div>
-                <div class="fillup-mpg">${mpg}</div>
+    fillupItem.innerHTML = `
+        <div class="fillup-header">
+            <div>
+                <div class="fillup-vehicle">${getVehicleName(fillup.vehicle_id)}</div>
+                <div class="fillup-date">${formatDateTime(fillup.date)}</div>
             </div>
+            <div class="fillup-mpg">${mpg}</div>
+        </div>
 
-            <div class="fillup-details">
-                <div class="fillup-detail-item">
-                    <div class="fillup-detail-label">Mileage</div>
-                    <div class="fillup-detail-value">${formatMileage(fillup.mileage)} mi</div>
-                </div>
-                <div class="fillup-detail-item">
-                    <div class="fillup-detail-label">Gallons</div>
-                    <div class="fillup-detail-value">${fillup.gallons} gal</div>
-                </div>
-                <div class="fillup-detail-item">
-                    <div class="fillup-detail-label">Price/Gal</div>
-                    <div class="fillup-detail-value">${formatCurrency(fillup.price_per_gallon)}</div>
-                </div>
-                <div class="fillup-detail-item">
-                    <div class="fillup-detail-label">Total Cost</div>
-                    <div class="fillup-detail-value">${formatCurrency(fillup.total_cost)}</div>
-                </div>
+        <div class="fillup-details">
+            <div class="fillup-detail-item">
+                <div class="fillup-detail-label">Mileage</div>
+                <div class="fillup-detail-value">${formatMileage(fillup.mileage)} mi</div>
             </div>
-
-            ${fillup.location ? `<div class="fillup-location">📍 ${fillup.location}</div>` : ''}
-            ${fillup.notes ? `<div class="fillup-notes">${fillup.notes}</div>` : ''}
-
-            <div class="fillup-actions">
-                <button onclick="deleteFillup(${fillup.id})" class="secondary-btn" style="background: #fee2e2; color: #ef4444; border-color: #ef4444;">Delete</button>
+            <div class="fillup-detail-item">
+                <div class="fillup-detail-label">Gallons</div>
+                <div class="fillup-detail-value">${fillup.gallons} gal</div>
             </div>
-        `;
+            <div class="fillup-detail-item">
+                <div class="fillup-detail-label">Price/Gal</div>
+                <div class="fillup-detail-value">${formatCurrency(fillup.price_per_gallon)}</div>
+            </div>
+            <div class="fillup-detail-item">
+                <div class="fillup-detail-label">Total Cost</div>
+                <div class="fillup-detail-value">${formatCurrency(fillup.total_cost)}</div>
+            </div>
+        </div>
 
-        list.appendChild(fillupItem);
-    });
+        ${fillup.location ? `<div class="fillup-location">📍 ${fillup.location}</div>` : ''}
+        ${fillup.notes ? `<div class="fillup-notes">${fillup.notes}</div>` : ''}
 
-    showElement(list);
+        <div class="fillup-actions">
+            <button onclick="deleteFillup(${fillup.id})" class="secondary-btn" style="background: #fee2e2; color: #ef4444; border-color: #ef4444;">Delete</button>
+        </div>
+    `;
+
+    return fillupItem;
 }
 
 async function deleteFillup(fillupId) {
@@ -494,8 +730,7 @@ async function deleteFillup(fillupId) {
         }
 
         showMessage('Fill-up deleted successfully');
-        loadFillups();
-        loadVehicles();
+        fillupsList.removeWhere(fillup => fillup.id === fillupId);
         loadDashboardStats();
     } catch (error) {
         showMessage(error.message, 'error');
@@ -563,102 +798,69 @@ async function createMaintenance(event) {
             throw new Error(error.detail || 'Failed to add maintenance record');
         }
 
+        const record = await response.json();
         showMessage('Maintenance record added successfully!');
         hideMaintenanceForm();
-        loadMaintenance();
+        maintenanceList.insert(record);
     } catch (error) {
         showMessage(error.message, 'error');
     }
 }
 
 async function loadMaintenance() {
-    const container = document.getElementById('maintenance-container');
-    const loading = document.getElementById('maintenance-loading');
-    const empty = document.getElementById('maintenance-empty');
-    const list = document.getElementById('maintenance-list');
-
-    try {
-        showElement(loading);
-        hideElement(empty);
-        hideElement(list);
-
-        const response = await fetch(`${API_BASE}/api/maintenance`);
-        if (!response.ok) {
-            throw new Error('Failed to load maintenance records');
-        }
-
-        const data = await response.json();
-        hideElement(loading);
-
-        if (data.records.length === 0) {
-            showElement(empty);
-        } else {
-            displayMaintenance(data.records);
-        }
-    } catch (error) {
-        hideElement(loading);
-        showMessage('Failed to load maintenance records', 'error');
-        console.error('Error loading maintenance:', error);
-    }
+    await maintenanceList.reset();
 }
 
-function displayMaintenance(records) {
-    const list = document.getElementById('maintenance-list');
-    list.innerHTML = '';
-
-    records.forEach(record => {
-        const maintenanceItem = document.createElement('div');
-        maintenanceItem.className = 'maintenance-item';
+function renderMaintenanceItem(record) {
+    const maintenanceItem = document.createElement('div');
+    maintenanceItem.className = 'maintenance-item';
 
-        const serviceIcon = getServiceTypeIcon(record.service_type);
+    const serviceIcon = getServiceTypeIcon(record.service_type);
 
-        maintenanceItem.innerHTML = `
-            <div class="maintenance-header">
-                <div>
-                    <div class="maintenance-service">${serviceIcon} ${record.service_type.replace('_', ' ')}</div>
-                    <div class="maintenance-vehicle">${record.vehicle.name}</div>
-                </div>
-                <div class="maintenance-date">${formatDateTime(record.date)}</div>
+    maintenanceItem.innerHTML = `
+        <div class="maintenance-header">
+            <div>
+                <div class="maintenance-service">${serviceIcon} ${record.service_type.replace('_', ' ')}</div>
+                <div class="maintenance-vehicle">${getVehicleName(record.vehicle_id)}</div>
             </div>
+            <div class="maintenance-date">${formatDateTime(record.date)}</div>
+        </div>
 
-            <div class="maintenance-description">${record.description}</div>
+        <div class="maintenance-description">${record.description}</div>
 
-            <div class="maintenance-details">
+        <div class="maintenance-details">
+            <div class="maintenance-detail-item">
+                <div class="maintenance-detail-label">Mileage</div>
+                <div class="maintenance-detail-value">${formatMileage(record.mileage)} mi</div>
+            </div>
+            ${record.cost ? `
                 <div class="maintenance-detail-item">
-                    <div class="maintenance-detail-label">Mileage</div>
-                    <div class="maintenance-detail-value">${formatMileage(record.mileage)} mi</div>
+                    <div class="maintenance-detail-label">Cost</div>
+                    <div class="maintenance-detail-value">${formatCurrency(record.cost)}</div>
                 </div>
-                ${record.cost ? `
-                    <div class="maintenance-detail-item">
-                        <div class="maintenance-detail-label">Cost</div>
-                        <div class="maintenance-detail-value">${formatCurrency(record.cost)}</div>
-                    </div>
-                ` : ''}
-                ${record.provider ? `
-                    <div class="maintenance-detail-item">
-                        <div class="maintenance-detail-label">Provider</div>
-                        <div class="maintenance-detail-value">${record.provider}</div>
-                    </div>
-                ` : ''}
-                ${record.next_service_mileage ? `
-                    <div class="maintenance-detail-item">
-                        <div class="maintenance-detail-label">Next Service</div>
-                        <div class="maintenance-detail-value">${formatMileage(record.next_service_mileage)} mi</div>
-                    </div>
-                ` : ''}
-            </div>
-
-            ${record.notes ? `<div class="maintenance-notes">${record.notes}</div>` : ''}
+            ` : ''}
+            ${record.provider ? `
+                <div class="maintenance-detail-item">
+                    <div class="maintenance-detail-label">Provider</div>
+                    <div class="maintenance-detail-value">${record.provider}</div>
+                </div>
+            ` : ''}
+            ${record.next_service_mileage ? `
+                <div class="maintenance-detail-item">
+                    <div class="maintenance-detail-label">Next Service</div>
+                    <div class="maintenance-detail-value">${formatMileage(record.next_service_mileage)} mi</div>
+                </div>
+            ` : ''}
+        </div>
 
-            <div class="maintenance-actions">
-                <button onclick="deleteMaintenance(${record.id})" class="secondary-btn" style="background: #fee2e2; color: #ef4444; border-color: #ef4444;">Delete</button>
-            </div>
-        `;
+        ${record.notes ? `<div class="maintenance-notes">${record.notes}</div>` : ''}
 
-        list.appendChild(maintenanceItem);
-    });
+        <div class="maintenance-actions">
+            <button onclick="deleteMaintenance(${record.id})" class="secondary-btn" style="background: #fee2e2; color: #ef4444; border-color: #ef4444;">Delete</button>
+        </div>
+    `;
 
-    showElement(list);
+    return maintenanceItem;
 }
 
 async function deleteMaintenance(recordId) {
@@ -676,7 +878,7 @@ async function deleteMaintenance(recordId) {
         }
 
         showMessage('Maintenance record deleted successfully');
-        loadMaintenance();
+        maintenanceList.removeWhere(record => record.id === recordId);
     } catch (error) {
         showMessage(error.message, 'error');
     }
@@ -734,7 +936,7 @@ async function createTrip(event) {
         showMessage('Trip started successfully!');
         hideTripForm();
         startActiveTrip(trip);
-        loadTrips();
+        tripsList.insert(trip);
     } catch (error) {
         showMessage(error.message, 'error');
     }
@@ -751,7 +953,7 @@ function startActiveTrip(trip) {
 
     const purposeText = trip.purpose ? trip.purpose.charAt(0).toUpperCase() + trip.purpose.slice(1) : 'Trip';
     titleEl.textContent = `Trip: ${purposeText}`;
-    vehicleEl.textContent = trip.vehicle?.name || 'Unknown Vehicle';
+    vehicleEl.textContent = getVehicleName(trip.vehicle_id);
     startTimeEl.textContent = formatDateTime(trip.start_date);
     startMileageEl.textContent = formatMileage(trip.start_mileage);
 
@@ -793,11 +995,11 @@ async function completeTrip(event) {
             throw new Error(error.detail || 'Failed to complete trip');
         }
 
+        const tripId = activeTrip.id;
         showMessage('Trip completed successfully!');
         closeTripModal();
         stopActiveTrip();
-        loadTrips();
-        loadVehicles();
+        await refreshTrip(tripId);
     } catch (error) {
         showMessage(error.message, 'error');
     }
@@ -809,100 +1011,73 @@ function stopActiveTrip() {
 }
 
 async function loadTrips() {
-    const container = document.getElementById('trips-container');
-    const loading = document.getElementById('trips-loading');
-    const empty = document.getElementById('trips-empty');
-    const list = document.getElementById('trips-list');
-
-    try {
-        showElement(loading);
-        hideElement(empty);
-        hideElement(list);
-
-        const response = await fetch(`${API_BASE}/api/trips`);
-        if (!response.ok) {
-            throw new Error('Failed to load trips');
-        }
-
-        const data = await response.json();
-        hideElement(loading);
+    await tripsList.reset();
+}
 
-        if (data.trips.length === 0) {
-            showElement(empty);
-        } else {
-            displayTrips(data.trips);
-        }
-    } catch (error) {
-        hideElement(loading);
-        showMessage('Failed to load trips', 'error');
-        console.error('Error loading trips:', error);
+async function refreshTrip(tripId) {
+    const response = await fetch(`${API_BASE}/api/trips/${tripId}`);
+    if (response.ok) {
+        tripsList.replace(await response.json());
     }
 }
 
-function displayTrips(trips) {
-    const list = document.getElementById('trips-list');
-    list.innerHTML = '';
+function renderTripItem(trip) {
+    const tripItem = document.createElement('div');
+    tripItem.className = `trip-item ${trip.end_date ? 'completed' : ''}`;
 
-    trips.forEach(trip => {
-        const tripItem = document.createElement('div');
-        tripItem.className = `trip-item ${trip.end_date ? 'completed' : ''}`;
+    const purposeIcon = getTripPurposeIcon(trip.purpose);
 
-        const purposeIcon = getTripPurposeIcon(trip.purpose);
+    tripItem.innerHTML = `
+        <div class="trip-header">
+            <div>
+                <div class="trip-purpose">${purposeIcon} ${trip.purpose ? trip.purpose.charAt(0).toUpperCase() + trip.purpose.slice(1) : 'Trip'}</div>
+                <div class="trip-vehicle">${getVehicleName(trip.vehicle_id)}</div>
+            </div>
+            <div class="trip-status">
+                ${trip.end_date ? '✅ Completed' : '🏃 Active'}
+            </div>
+        </div>
 
-        tripItem.innerHTML = `
-            <div class="trip-header">
-                <div>
-                    <div class="trip-purpose">${purposeIcon} ${trip.purpose ? trip.purpose.charAt(0).toUpperCase() + trip.purpose.slice(1) : 'Trip'}</div>
-                    <div class="trip-vehicle">${trip.vehicle?.name || 'Unknown Vehicle'}</div>
-                </div>
-                <div class="trip-status">
-                    ${trip.end_date ? '✅ Completed' : '🏃 Active'}
+        <div class="trip-details-grid">
+            <div class="trip-detail-item">
+                <div class="trip-detail-label">Started</div>
+                <div class="trip-detail-value">${formatDateTime(trip.start_date)}</div>
+            </div>
+            ${trip.end_date ? `
+                <div class="trip-detail-item">
+                    <div class="trip-detail-label">Completed</div>
+                    <div class="trip-detail-value">${formatDateTime(trip.end_date)}</div>
                 </div>
+            ` : ''}
+            <div class="trip-detail-item">
+                <div class="trip-detail-label">Start Mileage</div>
+                <div class="trip-detail-value">${formatMileage(trip.start_mileage)} mi</div>
             </div>
-
-            <div class="trip-details-grid">
+            ${trip.end_mileage ? `
                 <div class="trip-detail-item">
-                    <div class="trip-detail-label">Started</div>
-                    <div class="trip-detail-value">${formatDateTime(trip.start_date)}</div>
+                    <div class="trip-detail-label">End Mileage</div>
+                    <div class="trip-detail-value">${formatMileage(trip.end_mileage)} mi</div>
                 </div>
-                ${trip.end_date ? `
-                    <div class="trip-detail-item">
-                        <div class="trip-detail-label">Completed</div>
-                        <div class="trip-detail-value">${formatDateTime(trip.end_date)}</div>
-                    </div>
-                ` : ''}
+            ` : ''}
+            ${trip.distance ? `
                 <div class="trip-detail-item">
-                    <div class="trip-detail-label">Start Mileage</div>
-                    <div class="trip-detail-value">${formatMileage(trip.start_mileage)} mi</div>
+                    <div class="trip-detail-label">Distance</div>
+                    <div class="trip-detail-value trip-distance">${formatMileage(trip.distance)} mi</div>
                 </div>
-                ${trip.end_mileage ? `
-                    <div class="trip-detail-item">
-                        <div class="trip-detail-label">End Mileage</div>
-                        <div class="trip-detail-value">${formatMileage(trip.end_mileage)} mi</div>
-                    </div>
-                ` : ''}
-                ${trip.distance ? `
-                    <div class="trip-detail-item">
-                        <div class="trip-detail-label">Distance</div>
-                        <div class="trip-detail-value trip-distance">${formatMileage(trip.distance)} mi</div>
-                    </div>
-                ` : ''}
-            </div>
-
-            ${trip.start_location ? `<div class="trip-location">📍 From: ${trip.start_location}</div>` : ''}
-            ${trip.end_location ? `<div class="trip-location">🏁 To: ${trip.end_location}</div>` : ''}
-            ${trip.notes ? `<div class="trip-notes">${trip.notes}</div>` : ''}
+            ` : ''}
+        </div>
 
-            <div class="trip-actions">
-                ${!trip.end_date ? '<button onclick="completeTripFromList(' + trip.id + ')" class="primary-btn">Complete Trip</button>' : ''}
-                <button onclick="deleteTrip(${trip.id})" class="secondary-btn" style="background: #fee2e2; color: #ef4444; border-color: #ef4444;">Delete</button>
-            </div>
-        `;
+        ${trip.start_location ? `<div class="trip-location">📍 From: ${trip.start_location}</div>` : ''}
+        ${trip.end_location ? `<div class="trip-location">🏁 To: ${trip.end_location}</div>` : ''}
+        ${trip.notes ? `<div class="trip-notes">${trip.notes}</div>` : ''}
 
-        list.appendChild(tripItem);
-    });
+        <div class="trip-actions">
+            ${!trip.end_date ? '<button onclick="completeTripFromList(' + trip.id + ')" class="primary-btn">Complete Trip</button>' : ''}
+            <button onclick="deleteTrip(${trip.id})" class="secondary-btn" style="background: #fee2e2; color: #ef4444; border-color: #ef4444;">Delete</button>
+        </div>
+    `;
 
-    showElement(list);
+    return tripItem;
 }
 
 async function completeTripFromList(tripId) {
@@ -936,7 +1111,7 @@ async function deleteTrip(tripId) {
         }
 
         showMessage('Trip deleted successfully');
-        loadTrips();
+        tripsList.removeWhere(trip => trip.id === tripId);
     } catch (error) {
         showMessage(error.message, 'error');
     }
@@ -945,9 +1120,7 @@ async function deleteTrip(tripId) {
 // Utility functions
 async function loadVehiclesForSelect(selectId) {
     try {
-        if (currentVehicles.length === 0) {
-            await loadVehicles();
-        }
+        if (!await ensureVehiclesLoaded()) return;
 
         const select = document.getElementById(selectId);
         const currentValue = select.value;
@@ -1003,10 +1176,22 @@ async function init() {
     // Setup event listeners first
     setupEventListeners();
 
-    // Load data
+    fillupsList = createPagedList({
+        name: 'fillups', url: '/api/fillups', itemsKey: 'fillups', dateKey: 'date', renderItem: renderFillupItem
+    });
+    maintenanceList = createPagedList({
+        name: 'maintenance', url: '/api/maintenance', itemsKey: 'records', dateKey: 'date', renderItem: renderMaintenanceItem
+    });
+    tripsList = createPagedList({
+        name: 'trips', url: '/api/trips', itemsKey: 'trips', dateKey: 'start_date', renderItem: renderTripItem
+    });
+
+    // Load data; list rows show vehicle names, so vehicles come first
     await Promise.all([
         loadDashboardStats(),
-        loadVehicles(),
+        ensureVehiclesLoaded()
+    ]);
+    await Promise.all([
         loadFillups(),
         loadMaintenance(),
         loadTrips()